@@ -1,4 +1,25 @@
+import importlib.metadata
+
 from .__spi__.type import Box, Formatter, MediaAware, Parsed
 
 
+def _get_source_version() -> str:
+    # a source checkout has no package metadata, the version is derived from the
+    # sources instead, so that version dependent caches are invalidated by changes
+    import hashlib
+    from pathlib import Path
+
+    digest = hashlib.sha256()
+    root = Path(__file__).parent
+    for file in sorted(root.rglob("*.py")):
+        digest.update(file.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(file.read_bytes())
+    return f"0.0.0+src.{digest.hexdigest()[:12]}"
+
+
+try:
+    __version__ = importlib.metadata.version("datariot")
+except importlib.metadata.PackageNotFoundError:
+    __version__ = _get_source_version()
+
 __all__ = ["Box", "Formatter", "Parsed", "MediaAware"]
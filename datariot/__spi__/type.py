@@ -1,6 +1,7 @@
 import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from functools import lru_cache
 from math import ceil, floor
 from typing import Callable, Generic, List, Literal, Optional, Tuple, TypeVar
 
@@ -30,6 +31,8 @@ class Box:
     tbd
     """
 
+    __slots__ = ("x1", "x2", "y1", "y2")
+
     def __init__(
         self,
         x1: Optional[float],
@@ -116,12 +119,34 @@ class Box:
         yield self.x2
         yield self.y2
 
+    def __getstate__(self) -> dict:
+        # subclasses may declare slots or keep their attributes in a __dict__
+        state = {name: getattr(self, name) for name in _get_slots(type(self)) if hasattr(self, name)}
+        state.update(getattr(self, "__dict__", {}))
+        return state
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+@lru_cache(maxsize=None)
+def _get_slots(cls: type) -> Tuple[str, ...]:
+    names = []
+    for base in cls.__mro__:
+        slots = base.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+
+    return tuple(name for name in names if name not in ("__dict__", "__weakref__"))
+
 
 class MediaAware(ABC):
     """
     tbd
     """
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def id(self) -> str:
@@ -176,6 +201,16 @@ class Parsed:
             write_file(without_ext(path) + ".json", json.dumps(self.properties))
 
 
+@dataclass
+class ParseFailure:
+    """
+    Result object of a failed parser invocation in a parallel folder parse.
+    """
+
+    path: str
+    error: str
+
+
 class Parser(ABC):
     """
     tbd
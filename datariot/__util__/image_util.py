@@ -33,7 +33,15 @@ def from_base64(encoded_image: Union[str, bytes]):
     return Image.open(BytesIO(base64.b64decode(encoded_image)))
 
 
-def to_base64(image):
+def to_bytes(image) -> bytes:
     im_file = BytesIO()
     image.save(im_file, format=image.format or "webp")
-    return base64.b64encode(im_file.getvalue())
+    return im_file.getvalue()
+
+
+def to_base64(image):
+    return base64.b64encode(to_bytes(image))
+
+
+def get_mime_type(image):
+    return f"image/{(image.format or 'webp').lower()}"
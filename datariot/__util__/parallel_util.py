@@ -0,0 +1,143 @@
+import logging
+import multiprocessing
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, TypeVar, Union
+
+from datariot.__spi__.type import ParseFailure
+
+
+T = TypeVar("T")
+
+
+def _work(func: Callable[[str], T], conn: Connection):
+    while True:
+        path = conn.recv()
+        if path is None:
+            return
+
+        try:
+            conn.send(func(path))
+        except Exception as ex:
+            # also covers results which cannot be pickled
+            conn.send(ParseFailure(path, repr(ex)))
+
+
+class _Worker:
+    def __init__(self, func: Callable[[str], T]):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_work, args=(func, child_conn))
+        self.process.start()
+        child_conn.close()
+
+        self.path: Optional[str] = None
+        self.deadline: Optional[float] = None
+
+    def submit(self, path: str, timeout: Optional[float]):
+        self.path = path
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.conn.send(path)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        self.conn.close()
+
+
+def parse_files_parallel(
+    func: Callable[[str], T],
+    files: Iterable[str],
+    workers: int,
+    timeout: Optional[float] = None,
+) -> Iterator[Union[T, ParseFailure]]:
+    """
+    Applies `func` to each file in one of `workers` processes and yields the results
+    in order of completion. Each worker handles a single file at a time, so at most
+    `workers` documents are in flight and files are only pulled from `files` when a
+    worker becomes idle. Exceptions, timeouts and crashed workers are yielded as
+    `ParseFailure`, a worker which timed out or crashed is replaced by a new one.
+    """
+    files = iter(files)
+    idle = [_Worker(func) for _ in range(workers)]
+    busy: Dict[Connection, _Worker] = {}
+
+    try:
+        while True:
+            while idle:
+                path = next(files, None)
+                if path is None:
+                    break
+                worker = idle.pop()
+                worker.submit(path, timeout)
+                busy[worker.conn] = worker
+
+            if not busy:
+                return
+
+            deadlines = [w.deadline for w in busy.values() if w.deadline is not None]
+            wait_time = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+            for conn in wait(list(busy), wait_time):
+                worker = busy.pop(conn)
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    # worker died, e.g. by a segfault or the oom killer
+                    result = ParseFailure(
+                        worker.path, f"worker exited with code {worker.process.exitcode}"
+                    )
+                    worker.kill()
+                    worker = _Worker(func)
+
+                idle.append(worker)
+                yield result
+
+            now = time.monotonic()
+            for conn, worker in list(busy.items()):
+                if worker.deadline is not None and worker.deadline <= now:
+                    del busy[conn]
+                    worker.kill()
+                    idle.append(_Worker(func))
+                    yield ParseFailure(worker.path, f"timeout after {timeout} seconds")
+    finally:
+        for worker in idle:
+            worker.close()
+        for worker in busy.values():
+            worker.kill()
+
+
+def parse_files(
+    func: Callable[[str], T],
+    files: Iterable[str],
+    workers: int = 1,
+    timeout: Optional[float] = None,
+    action: str = "parsing",
+) -> Iterator[T]:
+    """
+    Applies `func` to each file and yields the results, in worker processes with
+    `workers > 1` (see `parse_files_parallel`) and in this process otherwise. Failed
+    files are logged and skipped in both modes, `timeout` only applies to workers.
+    """
+    if workers > 1:
+        for result in parse_files_parallel(func, files, workers, timeout):
+            if isinstance(result, ParseFailure):
+                logging.warning(f"error while {action} {result.path}: {result.error}")
+                continue
+            yield result
+        return
+
+    for file in files:
+        try:
+            result = func(file)
+        except Exception as ex:
+            logging.warning(f"error while {action} {file}: {ex!r}")
+            continue
+        yield result
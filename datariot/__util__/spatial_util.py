@@ -0,0 +1,91 @@
+import heapq
+from collections import defaultdict
+from math import ceil, floor
+from typing import Dict, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from datariot.__spi__.type import Box
+
+
+B = TypeVar("B", bound=Box)
+
+_MAX_CELLS_PER_AXIS = 128
+
+
+class BoxIndex(Generic[B]):
+    """
+    Uniform grid index over boxes.
+    Each box is registered in all grid cells it covers, so a query only checks the
+    boxes registered in the cells covered by the query region instead of all boxes.
+    """
+
+    def __init__(self, boxes: Sequence[B], cell_size: Optional[int] = None):
+        self.boxes = list(boxes)
+        self.cell_size = cell_size or self._estimate_cell_size(self.boxes)
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+        for idx, box in enumerate(self.boxes):
+            for cell in self._get_cells(box.x1, box.y1, box.x2, box.y2):
+                self._cells[cell].append(idx)
+
+    def query(self, x1: float, y1: float, x2: float, y2: float) -> List[int]:
+        """
+        Returns the ascending indices of all boxes which may intersect the given
+        region (borders included). Callers still have to check the exact predicate.
+        """
+        cells = list(self._get_cells(x1, y1, x2, y2))
+        if len(cells) == 1:
+            return self._cells.get(cells[0], [])
+
+        found = set()
+        for cell in cells:
+            found.update(self._cells.get(cell, ()))
+
+        return sorted(found)
+
+    def query_box(self, box: Box, tolerance: float = 0) -> List[int]:
+        return self.query(
+            box.x1 - tolerance, box.y1 - tolerance, box.x2 + tolerance, box.y2 + tolerance
+        )
+
+    def _get_cells(self, x1: float, y1: float, x2: float, y2: float) -> Iterator[Tuple[int, int]]:
+        size = self.cell_size
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        for cx in range(floor(x1 / size), floor(x2 / size) + 1):
+            for cy in range(floor(y1 / size), floor(y2 / size) + 1):
+                yield cx, cy
+
+    @staticmethod
+    def _estimate_cell_size(boxes: List[B]) -> int:
+        if not boxes:
+            return 1
+
+        mean_width = sum(b.width for b in boxes) / len(boxes)
+        mean_height = sum(b.height for b in boxes) / len(boxes)
+        extent = max(
+            max(b.x2 for b in boxes) - min(b.x1 for b in boxes),
+            max(b.y2 for b in boxes) - min(b.y1 for b in boxes),
+        )
+
+        return max(1, ceil(max(mean_width, mean_height, extent / _MAX_CELLS_PER_AXIS)))
+
+
+def sweep_x_overlapping_pairs(boxes: Sequence[Box]) -> Iterator[Tuple[int, int]]:
+    """
+    Sweep line along the x axis which yields each index pair (i, j) of boxes with
+    intersecting x ranges (borders included) exactly once, with `boxes[i].x1 <=
+    boxes[j].x1`. Boxes are expected to satisfy `x1 <= x2`.
+    """
+    order = sorted(range(len(boxes)), key=lambda idx: boxes[idx].x1)
+    # min heap of (x2, index) of all boxes which may still intersect the sweep line
+    active: List[Tuple[int, int]] = []
+
+    for j in order:
+        x1 = boxes[j].x1
+        while active and active[0][0] < x1:
+            heapq.heappop(active)
+
+        for _, i in active:
+            yield i, j
+
+        heapq.heappush(active, (boxes[j].x2, j))
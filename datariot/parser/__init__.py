@@ -1 +1,2 @@
 from .__spi__ import BoxFilterSizeConfig
+from .cached_parser import CachedParser, ParseCache
@@ -29,6 +29,8 @@ class Font:
 
 
 class FontAware(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def font(self) -> Font:
@@ -36,6 +38,8 @@ class FontAware(ABC):
 
 
 class TextAware(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def text(self) -> str:
@@ -0,0 +1,252 @@
+import dataclasses
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+import types
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel
+
+from datariot import __version__
+from datariot.__spi__.type import Parsed, Parser
+
+
+_VERSION_FILE = "VERSION"
+_ENTRY_EXT = ".pkl"
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_config(config: Any) -> str:
+    if isinstance(config, BaseModel):
+        data = config.model_dump(warnings=False)
+    elif dataclasses.is_dataclass(config):
+        data = dataclasses.asdict(config)
+    else:
+        data = config
+
+    def _default(obj):
+        if callable(obj):
+            # callables like the pdf object filter are identified by name, bytecode,
+            # constants, defaults and closure values
+            return hashlib.sha256(_describe(obj).encode("utf-8")).hexdigest()
+        return repr(obj)
+
+    encoded = json.dumps(data, default=_default, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _describe(value: Any, seen: Optional[set] = None) -> str:
+    """Describes a value by its content, in particular functions and their code."""
+    seen = set() if seen is None else seen
+
+    def _all(values) -> str:
+        return ",".join(_describe(e, seen) for e in values)
+
+    if isinstance(value, types.CodeType):
+        return f"code:{value.co_code.hex()}:{','.join(value.co_names)}:({_all(value.co_consts)})"
+    if isinstance(value, (tuple, list)):
+        return f"({_all(value)})"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k!r}:{_describe(v, seen)}" for k, v in sorted(value.items(), key=repr)) + "}"
+    if isinstance(value, functools.partial):
+        return f"partial:{_describe(value.func, seen)}:({_all(value.args)}):{_describe(value.keywords, seen)}"
+    if callable(value):
+        name = f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', '')}"
+        code = getattr(value, "__code__", None)
+        if code is None or id(value) in seen:
+            # builtins and recursive references are identified by name only
+            return name
+        seen.add(id(value))
+        closure = []
+        for cell in value.__closure__ or ():
+            try:
+                closure.append(cell.cell_contents)
+            except ValueError:  # unbound cell
+                closure.append(None)
+        return ":".join([
+            name,
+            _describe(code, seen),
+            f"({_all(value.__defaults__ or ())})",
+            _describe(value.__kwdefaults__ or {}, seen),
+            f"({_all(closure)})",
+        ])
+    return repr(value)
+
+
+class ParseCache:
+    """
+    On-disk cache of pickled parse results.
+    Entries are evicted in least recently used order as soon as their total size
+    exceeds `max_size` bytes. A cache written by a different `version`, by default
+    the datariot version, is cleared on initialization.
+    """
+
+    _last_access = 0
+
+    def __init__(self, path: str, max_size: int = 1 << 30, version: str = __version__):
+        self.path = path
+        self.max_size = max_size
+        self.version = version
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(path, exist_ok=True)
+        if self._read_version() != version:
+            self.clear()
+
+        self._entries = self._scan_entries()
+        self._size = sum(self._entries.values())
+
+    def get(self, key: str) -> Optional[Any]:
+        file = self._get_file(key)
+        try:
+            with open(file, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self._forget(key)
+            self.misses += 1
+            return None
+        except Exception as ex:
+            logging.warning(f"error while reading cache entry {file}: {ex}")
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._touch(file)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        file = self._get_file(key)
+        tmp_file = f"{file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, file)
+        self._touch(file)
+
+        # other processes may share the directory, so the size is taken from the
+        # entries on disk instead of the ones written by this instance
+        self._entries = self._scan_entries()
+        self._size = sum(self._entries.values())
+        self._evict()
+
+    def clear(self):
+        # only the files written by the cache are removed, the directory may be shared
+        for entry in os.scandir(self.path):
+            if entry.is_file() and (entry.name.endswith(_ENTRY_EXT) or _ENTRY_EXT + "." in entry.name):
+                os.remove(entry.path)
+
+        with open(os.path.join(self.path, _VERSION_FILE), "w") as file:
+            file.write(self.version)
+
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def _evict(self):
+        while self._size > self.max_size and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._remove(key)
+
+    def _remove(self, key: str):
+        self._forget(key)
+        try:
+            os.remove(self._get_file(key))
+        except FileNotFoundError:
+            pass
+
+    def _touch(self, file: str):
+        # the modification time is used as access time for the lru order, it is set
+        # explicitly in nanoseconds since the file system clock may be too coarse to
+        # order subsequent accesses
+        now = max(time.time_ns(), ParseCache._last_access + 1)
+        ParseCache._last_access = now
+        os.utime(file, ns=(now, now))
+
+    def _forget(self, key: str):
+        self._size -= self._entries.pop(key, 0)
+
+    def _get_file(self, key: str) -> str:
+        return os.path.join(self.path, key + _ENTRY_EXT)
+
+    def _read_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, _VERSION_FILE), "r") as file:
+                return file.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _scan_entries(self) -> "OrderedDict[str, int]":
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(_ENTRY_EXT):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, entry.name[: -len(_ENTRY_EXT)], stat.st_size))
+
+        return OrderedDict((key, size) for _, key, size in sorted(entries))
+
+
+class CachedParser(Parser):
+    """
+    Parser decorator which looks up the parse result of a file in a `ParseCache`.
+    The cache key consists of the file content, the parser type and its config, so
+    changed files or configs are parsed again.
+    """
+
+    def __init__(self, parser: Parser, cache: ParseCache):
+        self.parser = parser
+        self.cache = cache
+
+        config = getattr(parser, "config", getattr(parser, "_config", None))
+        self._parser_key = f"{type(parser).__qualname__}:{hash_config(config)}"
+
+    def get_key(self, path: str, **kwargs) -> str:
+        key = f"{self._parser_key}:{hash_file(path)}"
+        if kwargs:
+            key += ":" + repr(sorted(kwargs.items()))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def parse(
+        self, path: str, pages: Optional[Iterable[int]] = None, max_pages: Optional[int] = None
+    ) -> Parsed:
+        """
+        Parses the file or returns its cached result. `pages` and `max_pages` are
+        passed to parsers which support them, like `PDFParser.parse`, and are part
+        of the cache key.
+        """
+        kwargs = {}
+        if pages is not None:
+            kwargs["pages"] = tuple(pages)
+        if max_pages is not None:
+            kwargs["max_pages"] = max_pages
+
+        key = self.get_key(path, **kwargs)
+
+        parsed = self.cache.get(key)
+        if parsed is not None:
+            # the same content may have been cached under a different path
+            parsed.path = path
+            return parsed
+
+        parsed = self.parser.parse(path, **kwargs)
+        self.cache.put(key, parsed)
+
+        return parsed
@@ -29,6 +29,9 @@ class DocxTextBox(Box):
 
     @property
     def text(self):
+        if self.p is None:
+            return self._detached["text"]
+
         if len(self.p._element.xpath(".//w:sdt//w:t")) > 0:
             segments = self.p._element.xpath(".//w:t")
             return " ".join([str(e) for e in segments])
@@ -37,14 +40,20 @@ class DocxTextBox(Box):
 
     @property
     def style_name(self):
+        if self.p is None:
+            return self._detached["style_name"]
+
         return self.p.style.name
 
     @property
     def style(self):
-        return self.p.style
+        return self.p.style if self.p is not None else None
 
     @property
     def font_size(self):
+        if self.p is None:
+            return self._detached["font_size"]
+
         font_size = self.get_max_font_size(self.p.runs)
         if font_size >= 0:
             return font_size
@@ -74,6 +83,18 @@ class DocxTextBox(Box):
         except:
             return -1
 
+    def __getstate__(self):
+        # python-docx paragraphs are bound to the opened document and cannot be
+        # pickled, keep the derived values instead
+        state = super().__getstate__()
+        state["p"] = None
+        state["_detached"] = {
+            "text": self.text,
+            "style_name": self.style_name,
+            "font_size": self.font_size,
+        }
+        return state
+
     def __repr__(self):
         return self.text
 
@@ -108,6 +129,9 @@ class DocxTableBox(Box):
 
     @property
     def font_sizes(self) -> List[int]:
+        if self.paragraphs is None:
+            return self._detached_font_sizes
+
         def get_font_size(runs: List[Run]) -> int:
             max_size = -1
             for run in runs:
@@ -124,6 +148,13 @@ class DocxTableBox(Box):
 
         return [get_font_size(p.runs) for p in flatten(self.paragraphs)]
 
+    def __getstate__(self):
+        # python-docx paragraphs cannot be pickled, see DocxTextBox
+        state = super().__getstate__()
+        state["paragraphs"] = None
+        state["_detached_font_sizes"] = self.font_sizes
+        return state
+
     def __repr__(self):
         lenghts = []
         for row in self.rows:
@@ -1,9 +1,9 @@
-import logging
-from typing import Iterator
+from typing import Iterator, Optional
 
 from datariot.__spi__.error import DataRiotException, DataRiotImportException
 from datariot.__spi__.type import FileFilter, Parser
 from datariot.__util__.io_util import get_files
+from datariot.__util__.parallel_util import parse_files
 from datariot.parser.docx.__spi__ import DocxParserConfig, ParsedDocx
 from datariot.parser.docx.docx_mixin import DocumentMixin
 
@@ -39,11 +39,17 @@ class DocxParser(Parser, DocumentMixin):
 
     @staticmethod
     def parse_folder(
-        path: str, file_filter: FileFilter = lambda _: True
+        path: str,
+        file_filter: FileFilter = lambda _: True,
+        workers: int = 1,
+        timeout: Optional[float] = None,
     ) -> Iterator[ParsedDocx]:
-        for file in get_files(path, ".docx"):
-            try:
-                if file_filter(file):
-                    yield DocxParser().parse(file)
-            except DataRiotException as ex:
-                logging.warning(ex)
+        """
+        Parses all docx files of the given folder. With `workers > 1` the documents are
+        parsed in worker processes and yielded in order of completion, failed files and
+        files exceeding `timeout` seconds are logged and skipped.
+        """
+        parser = DocxParser()
+        files = (file for file in get_files(path, ".docx") if file_filter(file))
+
+        yield from parse_files(parser.parse, files, workers, timeout)
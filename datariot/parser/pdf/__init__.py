@@ -1,6 +1,8 @@
 from .__spi__ import (
     BBoxConfig,
+    InspectedPDF,
     OcrConfig,
+    ParallelConfig,
     ParsedPDF,
     PDFParserConfig,
     TableBoxConfig,
@@ -1,7 +1,11 @@
+import inspect
+import os
 import tempfile
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import wraps
 from pathlib import Path
-from typing import Callable, List, Literal, Optional
+from typing import Callable, Iterator, List, Literal, Optional, Tuple
 
 from pdfminer.pdfparser import PDFSyntaxError
 from pdfminer.psparser import PSEOF
@@ -9,13 +13,19 @@ from pydantic import BaseModel
 
 from datariot.__spi__.type import Parsed
 from datariot.parser.__spi__ import BoxFilterSizeConfig, FontSpecification, RegexPattern
+from datariot.parser.pdf.filter.metrics_collector import MetricsMode
 from datariot.parser.pdf.pdf_formatter import JSONPDFFormatter
+from datariot.parser.pdf.pdf_model import LazyPDFPages, PageBoundBox
 
 
 class TableBoxConfig(BaseModel):
     strategy: Literal["default", "camelot"] = "default"
     vertical_strategy: str = "lines"
     horizontal_strategy: str = "lines"
+    media_path: Optional[str] = None
+    """Directory the image payloads of the camelot strategy are written to instead of
+    keeping them in memory as base64 strings, media entries then have a `path`
+    instead of a `content`"""
 
 
 class TextBoxConfig(BaseModel):
@@ -43,6 +53,16 @@ class OcrConfig(BaseModel):
     full_page_only_if_no_text: bool = False
     """Whether to perform ocr on a full page region containing extractable text"""
 
+    only_scanned_pages: bool = False
+    """Whether to perform ocr only on pages classified as scans, i.e., pages with
+    hardly any extractable text which are mostly covered by images"""
+
+    scan_max_chars: int = 10
+    """Maximum number of extractable non-blank characters on a scanned page"""
+
+    scan_min_image_coverage: float = 0.5
+    """Minimum ratio of the page area covered by images on a scanned page"""
+
     strategy: Literal["text", "data"] = "text"
     """
     Strategy to extract text from images
@@ -60,6 +80,15 @@ class OcrConfig(BaseModel):
     filter_box_min_chars: int = 50
     """Minimum number of characters in an ocr box to be included"""
 
+    workers: Optional[int] = None
+    """Number of concurrent tesseract processes, defaults to the number of cpus"""
+
+    cache_path: Optional[str] = None
+    """Directory of a persistent cache of ocr results, results are not cached if unset"""
+
+    cache_max_size: int = 1 << 28
+    """Maximum size of the ocr cache in bytes"""
+
     keep_image_box: bool = True
     """Whether to keep image boxes in addition to ocr boxes"""
 
@@ -95,6 +124,11 @@ class BBoxConfig(BaseModel):
     columns_gap: int = 2
     columns_min_lines: int = 2
     columns_split_fonts: List[FontSpecification] = ["most_common_size"]
+    columns_max: int = 4
+    """Maximum number of equally wide columns a text box is split into"""
+    columns_detection: Literal["geometry", "raster"] = "geometry"
+    """Whether column gaps are detected from the object extents of the page or by
+    rendering the gaps and checking them for monochromacy (two or three columns)"""
     sorter_fuzzy: bool = False
     sorter_y_tolerance: int = 5
     parser_x_tolerance: int = 3
@@ -102,6 +136,9 @@ class BBoxConfig(BaseModel):
     merger_x_tolerance: int = 1
     merger_y_tolerance: int = 1
     merger_steps: int = 2
+    merger_max_raster_size: Optional[int] = None
+    """Maximum width and height of the raster used to merge image segments, larger
+    pages are merged on a proportionally downscaled raster"""
     image_filter_box_size: BoxFilterSizeConfig = BoxFilterSizeConfig(
         min_width=30, min_height=30
     )
@@ -110,21 +147,50 @@ class BBoxConfig(BaseModel):
     ocr_config: OcrConfig = OcrConfig()
     line_curve_config: LineCurveConfig = LineCurveConfig()
     media_use_uuid: bool = True
+    image_extraction: Literal["render", "embedded"] = "render"
+    """How image boxes obtain their pixels, `embedded` decodes plain bitmaps directly
+    from the pdf image stream and falls back to rendering the page region otherwise"""
     handle_hyperlinks: bool = True
     filter_hyperlink_patterns: List[str] = [r"https?\:\/\/\d+\.\d+\.\d+\.\d+\/"]
 
 
+class ParallelConfig(BaseModel):
+    workers: int = 1
+    """Number of processes used to parse the pages of a single document"""
+
+    pages_per_task: int = 16
+    """Number of consecutive pages a worker process parses per task"""
+
+
 class PDFParserConfig(BaseModel):
     screenshot: bool = False
     ocr: bool = False
     include_images: bool = True
     bbox_config: BBoxConfig = BBoxConfig()
     object_filter: Optional[Callable[[dict], bool]] = None
+    """Object filter applied to each page, must be picklable if `parallel.workers > 1`"""
+    parallel: ParallelConfig = ParallelConfig()
+    metrics: MetricsMode = "full"
+    """
+    Metrics collected per page
+
+    - `off`: no metrics, each page gets an empty entry
+    - `counts`: number of objects per tag and stroking color
+    - `full`: counts and the number of pixels covered by more than one object,
+      measured by painting the objects in order
+    - `coverage`: counts and the number of times each pixel is covered by more than
+      one object, measured in one pass on a raster of bounded size
+    """
+    repair_cache_path: Optional[str] = None
+    """Directory in which repaired copies of broken documents are kept, keyed by the
+    hash of the original file. Documents are repaired into a temp file if unset"""
 
 
 @dataclass
 class ParsedPDF(Parsed):
     metrics: dict = field(default_factory=lambda: {})
+    file: Optional[str] = field(default=None, compare=False)
+    """File the document was read from if it differs from `path`, e.g. a repaired copy"""
 
     @property
     def is_paged(self) -> bool:
@@ -134,22 +200,143 @@ class ParsedPDF(Parsed):
         formatter = JSONPDFFormatter()
         return {"path": self.path, "bboxes": [b.render(formatter) for b in self.bboxes]}
 
+    def close(self):
+        """Closes the file which is opened on demand for the pages of unpickled boxes."""
+        pages = self.__dict__.get("_pages")
+        if pages is not None:
+            pages.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state.pop("_pages", None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
 
+        # boxes are unpickled without their pages, reopen the file on demand
+        self._pages = LazyPDFPages(self)
+        for box in self.bboxes:
+            if isinstance(box, PageBoundBox):
+                box.attach(self._pages)
+
+
+@dataclass
 class ParsedPDFPage(ParsedPDF):
+    page_number: int = 0
+    """One based number of the parsed page"""
+
+
+@dataclass
+class InspectedPDF:
+    """
+    Document level information which is read from the trailer, the cross reference
+    table and the catalog without analyzing any page, see `PDFParser.inspect`.
+    """
+
+    path: str
+    properties: dict
+    outlines: List[Tuple[int, str]] = field(default_factory=lambda: [])
+    """Level and title of each outline entry in document order"""
+
     @property
-    def page_number(self) -> int:
-        return next(self.bboxes).page_number
+    def num_pages(self) -> int:
+        return self.properties["num_pages"]
 
 
 def resilient(func):
+    """
+    Repairs the document and parses it again if it cannot be read. The repaired
+    copy is passed as `file`, results keep the original `path`. Generators continue
+    with the page after the last yielded one via their `resume_after` argument
+    instead of starting over.
+    """
+    signature = inspect.signature(func)
+
+    def _bind(self, args, kwargs) -> inspect.BoundArguments:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        # the arguments are passed twice if the document is repaired
+        if bound.arguments.get("pages") is not None:
+            bound.arguments["pages"] = list(bound.arguments["pages"])
+        return bound
+
+    def _detach(result, cache_path: Optional[str]):
+        # a repaired temp file is removed once the call returns
+        if cache_path is None and isinstance(result, ParsedPDF):
+            result.file = None
+        return result
+
+    if inspect.isgeneratorfunction(func):
+        @wraps(func)
+        def _generator(self, *args, **kwargs):
+            bound = _bind(self, args, kwargs)
+            results = func(*bound.args, **bound.kwargs)
+            resume_after = bound.arguments["resume_after"]
+            while True:
+                try:
+                    result = next(results)
+                except StopIteration:
+                    return
+                except (PDFSyntaxError, PSEOF):
+                    break
+                resume_after = result.page_number
+                yield result
+
+            cache_path = self.config.repair_cache_path
+            with repaired_file(bound.arguments["path"], cache_path) as file:
+                bound.arguments.update(file=file, resume_after=resume_after)
+                for result in func(*bound.args, **bound.kwargs):
+                    yield _detach(result, cache_path)
+
+        return _generator
+
+    @wraps(func)
     def _decorator(self, *args, **kwargs):
+        bound = _bind(self, args, kwargs)
         try:
-            return func(self, *args, **kwargs)
+            return func(*bound.args, **bound.kwargs)
         except (PDFSyntaxError, PSEOF):
-            with tempfile.NamedTemporaryFile() as tmp:
-                import pdfplumber
-
-                pdfplumber.repair(Path(args[0]), tmp.name)
-                return func(self, tmp.name)
+            cache_path = self.config.repair_cache_path
+            with repaired_file(bound.arguments["path"], cache_path) as file:
+                bound.arguments["file"] = file
+                return _detach(func(*bound.args, **bound.kwargs), cache_path)
 
     return _decorator
+
+
+@contextmanager
+def repaired_file(path: str, cache_path: Optional[str] = None) -> Iterator[str]:
+    """
+    Yields the path of a repaired copy of the document. Copies in the cache
+    directory are named after the hash of the original file, so that a document
+    is repaired only once.
+    """
+    import pdfplumber
+
+    if cache_path is None:
+        with tempfile.NamedTemporaryFile() as tmp:
+            pdfplumber.repair(Path(path), tmp.name)
+            yield tmp.name
+        return
+
+    from datariot.parser.cached_parser import hash_file
+
+    file = os.path.join(cache_path, f"{hash_file(path)}.pdf")
+    if not os.path.exists(file):
+        os.makedirs(cache_path, exist_ok=True)
+        tmp_file = f"{file}.{os.getpid()}.tmp"
+        try:
+            pdfplumber.repair(Path(path), tmp_file)
+            os.replace(tmp_file, file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    yield file
@@ -5,6 +5,7 @@ from pdfminer.pdfdocument import PDFDocument, PDFNoOutlines
 from pdfplumber.page import Page
 
 from datariot.__spi__.type import Box
+from datariot.__util__.spatial_util import sweep_x_overlapping_pairs
 from datariot.parser.__spi__ import BoxFilterSizeConfig
 from datariot.parser.pdf.__spi__ import BBoxConfig
 from datariot.parser.pdf.bbox.__spi__ import BoundingBoxFilter
@@ -79,6 +80,10 @@ class PDFOutlinesBoundingBoxFilter(BoundingBoxFilter):
 
 
 class BoxOverlapsBoundingBoxFilter(BoundingBoxFilter):
+    """
+    Removes all boxes which overlap with any other box (borders included).
+    """
+
     def __call__(self, page: Page, bboxes: List[B]) -> List[B]:
         if len(bboxes) == 0:
             return []
@@ -89,81 +94,57 @@ class BoxOverlapsBoundingBoxFilter(BoundingBoxFilter):
             return w * h
 
         bboxes = list(reversed(sorted(bboxes, key=by_size)))
-        result = []
-
-        for i in range(len(bboxes)):
-            box1 = bboxes[i]
-            exclude = False
-            for j in range(len(bboxes)):
-                if i == j:
-                    continue
-
-                box2 = bboxes[j]
+        overlapping = [False] * len(bboxes)
 
-                # checking for boxes overlap
-                expr1 = box1.x2 >= box2.x1
-                expr2 = box2.x2 >= box1.x1
-                expr3 = box1.y2 >= box2.y1
-                expr4 = box2.y2 >= box1.y1
+        for i, j in sweep_x_overlapping_pairs(bboxes):
+            if overlapping[i] and overlapping[j]:
+                continue
 
-                if all([expr1, expr2, expr3, expr4]):
-                    exclude = True
-
-            if not exclude:
-                result.append(box1)
+            box1 = bboxes[i]
+            box2 = bboxes[j]
+            if box1.y2 >= box2.y1 and box2.y2 >= box1.y1:
+                overlapping[i] = True
+                overlapping[j] = True
 
-        return result
+        return [b for i, b in enumerate(bboxes) if not overlapping[i]]
 
 
 class BoxIdentityBoundingBoxFilter(BoundingBoxFilter):
+    """
+    Removes duplicate boxes with identical coordinates, keeping the last one in
+    descending order of size.
+    """
+
     def __call__(self, page: Page, bboxes: List[B]) -> List[B]:
         if len(bboxes) == 0:
             return []
 
         bboxes = sorted(bboxes, key=lambda x: x.size, reverse=True)
-        result = []
+        last_idx = {tuple(box): i for i, box in enumerate(bboxes)}
 
-        for i, box1 in enumerate(bboxes):
-            exclude = False
-            for box2 in bboxes[i + 1:]:
-                # checking for boxes identity
-                expr1 = box1.x1 == box2.x1
-                expr2 = box1.x2 == box2.x2
-                expr3 = box1.y1 == box2.y1
-                expr4 = box1.y2 == box2.y2
-
-                if all([expr1, expr2, expr3, expr4]):
-                    exclude = True
-                    break
-
-            if not exclude:
-                result.append(box1)
-
-        return result
+        return [b for i, b in enumerate(bboxes) if last_idx[tuple(b)] == i]
 
 
 class NestedTableBoundingBoxFilter(BoundingBoxFilter):
+    """
+    Removes all boxes which are contained in any other box (borders included).
+    """
+
     def __call__(self, page: Page, bboxes: List[B]) -> List[B]:
         if len(bboxes) == 0:
             return []
 
         bboxes = sorted(bboxes, key=lambda x: x.size, reverse=True)
-        result = []
-
-        for i, box1 in enumerate(bboxes):
-            exclude = False
-            for j, box2 in enumerate(bboxes):
-                if i == j:
-                    continue
-
-                if box1.is_contained_in(box2):
-                    exclude = True
-                    break
+        nested = [False] * len(bboxes)
 
-            if not exclude:
-                result.append(box1)
+        # containment implies intersecting x ranges, so only these pairs are checked
+        for i, j in sweep_x_overlapping_pairs(bboxes):
+            if not nested[i] and bboxes[i].is_contained_in(bboxes[j]):
+                nested[i] = True
+            if not nested[j] and bboxes[j].is_contained_in(bboxes[i]):
+                nested[j] = True
 
-        return result
+        return [b for i, b in enumerate(bboxes) if not nested[i]]
 
 
 class TextContentBoundingBoxFilter(BoundingBoxFilter):
@@ -1,10 +1,11 @@
-from math import ceil
+from math import ceil, floor
 from typing import List, Union
 
 from pdfplumber.page import Page
 
 from datariot.__spi__.type import Box
-from datariot.__util__.geometric_util import calculate_bounding_boxes
+from datariot.__util__.geometric_util import calculate_bounding_boxes, paint_rectangles
+from datariot.__util__.spatial_util import BoxIndex
 from datariot.parser.__spi__ import DocumentFonts
 from datariot.parser.pdf.__spi__ import BBoxConfig
 from datariot.parser.pdf.pdf_model import PDFImageBox, PDFLineCurveBox, PDFTextBox
@@ -18,45 +19,46 @@ class CoordinatesBoundingBoxMerger:
         if len(bboxes) == 0:
             return []
 
-        doc_fonts = DocumentFonts.from_bboxes(bboxes)
+        config = self._config
+        most_common_size = DocumentFonts.from_bboxes(bboxes).most_common_size
 
         results: List[PDFTextBox] = []
-        prev_bbox = bboxes[0].copy()
+
+        # state of the box which is currently merged, its text is collected as
+        # fragments which are joined once the box is complete
+        first = bboxes[0]
+        fragments = [first.text]
+        x1, y1, x2, y2 = first.x1, first.y1, first.x2, first.y2
+        font_name, font_size, font_weight = first.font_name, first.font_size, first.font_weight
+        hyperlinks = first.hyperlinks
+        is_prev_blank = first.text.strip() == ""
+
         for bbox in bboxes[1:]:
-            is_same_line = (
-                abs(prev_bbox.y2 - bbox.y2) <= self._config.merge_same_line_tolerance
-            )
-            is_blank = bbox.text.strip() == ""
-            is_single_char = len(bbox.text.strip()) == 1
-            is_prev_blank = prev_bbox.text.strip() == ""
+            text = bbox.text
+            stripped = text.strip()
+            is_same_line = abs(y2 - bbox.y2) <= config.merge_same_line_tolerance
+            is_blank = stripped == ""
+            is_single_char = len(stripped) == 1
             is_previous_most_common_font_size = (
-                not is_prev_blank and prev_bbox.font_size == doc_fonts.most_common_size
+                not is_prev_blank and font_size == most_common_size
             )
-            has_link = bbox.last_hyperlink is not None
-            is_same_link = prev_bbox.last_hyperlink == bbox.last_hyperlink
+            last_hyperlink = bbox.last_hyperlink
+            has_link = last_hyperlink is not None
+            is_same_link = (hyperlinks[-1].uri if hyperlinks else None) == last_hyperlink
             continue_link = has_link and is_same_link
 
             # same font size
-            expr1 = (
-                not self._config.merge_same_font_size
-                or prev_bbox.font_size == bbox.font_size
-            )
+            expr1 = not config.merge_same_font_size or font_size == bbox.font_size
             # same font name
-            expr2 = (
-                not self._config.merge_same_font_name
-                or prev_bbox.font_name == bbox.font_name
-            )
+            expr2 = not config.merge_same_font_name or font_name == bbox.font_name
             # same font weight
-            expr3 = (
-                not self._config.merge_same_font_weight
-                or prev_bbox.font_weight == bbox.font_weight
-            )
+            expr3 = not config.merge_same_font_weight or font_weight == bbox.font_weight
             # always merge blanks, single chars, same line most common or font based
             font_rule = (
-                (self._config.merge_blank_always and is_blank)
-                or (self._config.merge_single_char_always and is_single_char)
+                (config.merge_blank_always and is_blank)
+                or (config.merge_single_char_always and is_single_char)
                 or (
-                    self._config.merge_same_line_always_after_most_common
+                    config.merge_same_line_always_after_most_common
                     and is_previous_most_common_font_size
                     and is_same_line
                 )
@@ -65,34 +67,42 @@ class CoordinatesBoundingBoxMerger:
             # same line
             same_line_rule = (
                 is_same_line
-                and prev_bbox.x2 < bbox.x1
-                and (bbox.x1 - prev_bbox.x2) < self._config.merge_x_tolerance
+                and x2 < bbox.x1
+                and (bbox.x1 - x2) < config.merge_x_tolerance
             )
             # consecutive lines
             consecutive_line_rule = (
-                self._config.merge_blank_consecutive_lines or not is_blank
-            ) and (bbox.y1 - prev_bbox.y2) < self._config.merge_y_tolerance
+                config.merge_blank_consecutive_lines or not is_blank
+            ) and (bbox.y1 - y2) < config.merge_y_tolerance
 
             if continue_link or (
                 font_rule and (same_line_rule or consecutive_line_rule)
             ):
-                prev_is_blank = prev_bbox.text.strip() == ""
-                separator = "" if continue_link else " " if is_same_line else "\n"
-                prev_bbox = prev_bbox.with_text(prev_bbox.text + separator + bbox.text)
-                if prev_is_blank:
-                    prev_bbox.font_name = bbox.font_name
-                    prev_bbox.font_size = bbox.font_size
-                prev_bbox.x1 = min(prev_bbox.x1, bbox.x1)
-                prev_bbox.y1 = min(prev_bbox.y1, bbox.y1)
-                prev_bbox.x2 = max(prev_bbox.x2, bbox.x2)
-                prev_bbox.y2 = max(prev_bbox.y2, bbox.y2)
-                prev_bbox.add_hyperlinks(bbox.hyperlinks)
+                fragments.append("" if continue_link else " " if is_same_line else "\n")
+                fragments.append(text)
+                if is_prev_blank:
+                    font_name, font_size, font_weight = bbox.font_name, bbox.font_size, bbox.font_weight
+                    is_prev_blank = is_blank
+                x1 = min(x1, bbox.x1)
+                y1 = min(y1, bbox.y1)
+                x2 = max(x2, bbox.x2)
+                y2 = max(y2, bbox.y2)
+                hyperlinks.extend(bbox.hyperlinks)
             else:
-                results.append(prev_bbox)
-                prev_bbox = bbox.copy()
+                results.append(PDFTextBox(
+                    x1, y1, x2, y2, "".join(fragments), font_size, font_name, first.page_number, hyperlinks
+                ))
+
+                first = bbox
+                fragments = [text]
+                x1, y1, x2, y2 = bbox.x1, bbox.y1, bbox.x2, bbox.y2
+                font_name, font_size, font_weight = bbox.font_name, bbox.font_size, bbox.font_weight
+                hyperlinks = bbox.hyperlinks
+                is_prev_blank = is_blank
 
-        if prev_bbox is not None:
-            results.append(prev_bbox)
+        results.append(PDFTextBox(
+            x1, y1, x2, y2, "".join(fragments), font_size, font_name, first.page_number, hyperlinks
+        ))
 
         return results
 
@@ -109,30 +119,80 @@ class GeometricImageSegmentsMerger:
 
         import numpy as np
 
-        roi = np.zeros((ceil(page.height), ceil(page.width)))
-        height, width = roi.shape
+        sources = bboxes
+        x_tolerance = self.config.merger_x_tolerance
+        y_tolerance = self.config.merger_y_tolerance
 
-        for _ in range(self.config.merger_steps):
-            for box in bboxes:
-                y1 = max(0, box.y1 - self.config.merger_y_tolerance)
-                y2 = min(height, box.y2 + self.config.merger_y_tolerance + 1)
-                x1 = max(0, box.x1 - self.config.merger_x_tolerance)
-                x2 = min(width, box.x2 + self.config.merger_x_tolerance + 1)
+        # very large pages are merged on a downscaled raster
+        scale = 1.0
+        max_size = self.config.merger_max_raster_size
+        if max_size is not None and max(page.width, page.height) > max_size:
+            scale = max_size / max(page.width, page.height)
 
-                roi[y1:y2, x1:x2] = 1
+        mask = np.zeros(
+            (ceil(page.height * scale), ceil(page.width * scale)), dtype=np.uint8
+        )
 
-            bboxes = calculate_bounding_boxes(roi)
+        for _ in range(self.config.merger_steps):
+            rects = np.array(
+                [
+                    (
+                        floor((box.x1 - x_tolerance) * scale),
+                        floor((box.y1 - y_tolerance) * scale),
+                        floor((box.x2 + x_tolerance) * scale) + 1,
+                        floor((box.y2 + y_tolerance) * scale) + 1,
+                    )
+                    for box in bboxes
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 4)
+            paint_rectangles(mask, rects)
+
+            bboxes = calculate_bounding_boxes(mask)
             bboxes = [
                 PDFImageBox(
                     page,
                     {
-                        "x0": e[0] - self.config.merger_x_tolerance,
-                        "x1": e[1] + self.config.merger_x_tolerance,
-                        "top": e[2] - self.config.merger_y_tolerance,
-                        "bottom": e[3] + self.config.merger_y_tolerance,
+                        "x0": e[0] / scale - x_tolerance,
+                        "x1": (e[1] + 1) / scale - 1 + x_tolerance,
+                        "top": e[2] / scale - y_tolerance,
+                        "bottom": (e[3] + 1) / scale - 1 + y_tolerance,
                     },
                 )
                 for e in bboxes
             ]
 
+        if any(isinstance(e, PDFImageBox) and e.embedded for e in sources):
+            bboxes = self._keep_embedded(sources, bboxes)
+
+        return bboxes
+
+    @staticmethod
+    def _keep_embedded(
+        sources: List[Union[PDFImageBox, PDFLineCurveBox]],
+        bboxes: List[PDFImageBox],
+    ) -> List[PDFImageBox]:
+        """
+        Merged boxes which originate from a single embedded image are replaced by
+        that image, so that their pixels can still be decoded directly and match the
+        bbox of the image rather than the one enlarged by the merge tolerances.
+        """
+        index = BoxIndex(bboxes)
+        origins: List[List[Union[PDFImageBox, PDFLineCurveBox]]] = [[] for _ in bboxes]
+
+        for source in sources:
+            cx = (source.x1 + source.x2) / 2
+            cy = (source.y1 + source.y2) / 2
+            for i in index.query(cx, cy, cx, cy):
+                box = bboxes[i]
+                if box.x1 <= cx <= box.x2 and box.y1 <= cy <= box.y2:
+                    origins[i].append(source)
+                    break
+
+        for i, origin in enumerate(origins):
+            if len(origin) != 1 or not isinstance(origin[0], PDFImageBox):
+                continue
+            if origin[0].embedded:
+                bboxes[i] = origin[0]
+
         return bboxes
@@ -1,14 +1,17 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from pdfplumber.display import PageImage
 from pdfplumber.page import CroppedPage, Page
+from pdfplumber.utils import get_bbox_overlap, obj_to_bbox
 
-from datariot.__spi__.type import ColumnPosition
+from datariot.__spi__.type import Box, ColumnPosition
 from datariot.__util__.fonts import check_font_specs
+from datariot.__util__.spatial_util import BoxIndex
 from datariot.parser.__spi__ import DocumentFonts
 from datariot.parser.pdf.__spi__ import BBoxConfig
 from datariot.parser.pdf.bbox.bbox_merger import CoordinatesBoundingBoxMerger
 from datariot.parser.pdf.pdf_model import PDFColumnTextBox, PDFTextBox
+from datariot.parser.pdf.pdf_render import page_render_cache
 
 
 class ColumnStyleBoundingBoxSlicer:
@@ -17,10 +20,17 @@ class ColumnStyleBoundingBoxSlicer:
         self._config = config
         self._box_merger = CoordinatesBoundingBoxMerger(config)
 
-    def __call__(self, page: Page, bboxes: List[PDFTextBox]) -> List[PDFTextBox]:
+    def __call__(
+        self, page: Page, bboxes: List[PDFTextBox], words: Optional[List[dict]] = None
+    ) -> List[PDFTextBox]:
+        """
+        Splits multi column text boxes into one box per column. The column words are
+        taken from the already extracted `words` of the page if given.
+        """
         if not bboxes or not self._config.columns_split:
             return bboxes
 
+        index = None
         doc_fonts = DocumentFonts.from_bboxes(bboxes)
         results = []
         for bbox in bboxes:
@@ -29,20 +39,16 @@ class ColumnStyleBoundingBoxSlicer:
                 and len(bbox.text.splitlines()) >= self._config.columns_min_lines
                 and check_font_specs(bbox, doc_fonts, self._config.columns_split_fonts)
             ):
-                column_crops = self._get_two_column_crops(page, bbox)
-                if not column_crops:
-                    column_crops = self._get_three_column_crops(page, bbox)
+                column_crops = self._get_column_crops(page, bbox)
 
                 if column_crops:
+                    if words is not None and index is None:
+                        index = BoxIndex([Box(w["x0"], w["x1"], w["top"], w["bottom"]) for w in words])
+
                     for crop, num, col in column_crops:
-                        # TODO: refactor to avoid code repetition from mixin
-                        crop_bboxes = crop.extract_words(
-                            extra_attrs=self._config.extract_words_extra_attrs,
-                            keep_blank_chars=self._config.extract_words_keep_blank_chars
-                        )
                         crop_bboxes = [
                             PDFTextBox.from_dict({**word, "page_number": page.page_number})
-                            for word in crop_bboxes
+                            for word in self._get_crop_words(crop, words, index)
                         ]
                         crop_bboxes = self._box_merger(page, crop_bboxes)
                         crop_bboxes = [PDFColumnTextBox.from_pdf_text_box(b, num, col) for b in crop_bboxes]
@@ -54,13 +60,88 @@ class ColumnStyleBoundingBoxSlicer:
 
         return results
 
+    def _get_crop_words(
+        self, crop: CroppedPage, words: Optional[List[dict]], index: Optional[BoxIndex]
+    ) -> List[dict]:
+        """
+        Returns the page words within the crop. Only if a word crosses the border of
+        the crop, the words of the crop are extracted again.
+        """
+        if words is not None:
+            crop_words = [
+                words[i]
+                for i in index.query(*crop.bbox)
+                if get_bbox_overlap(obj_to_bbox(words[i]), crop.bbox) is not None
+            ]
+            if all(get_bbox_overlap(obj_to_bbox(w), crop.bbox) == obj_to_bbox(w) for w in crop_words):
+                return crop_words
+
+        # TODO: refactor to avoid code repetition from mixin
+        return crop.extract_words(
+            extra_attrs=self._config.extract_words_extra_attrs,
+            keep_blank_chars=self._config.extract_words_keep_blank_chars
+        )
+
+    def _get_column_crops(self, page: Page, bbox: PDFTextBox) -> List[Tuple[CroppedPage, int, ColumnPosition]]:
+        if self._config.columns_detection == "raster":
+            return self._get_two_column_crops(page, bbox) or self._get_three_column_crops(page, bbox)
+
+        profile = self._get_x_profile(page, bbox)
+        width = bbox.x2 - bbox.x1
+        # prefer the finest partition, a four column layout also has an empty center
+        for num in range(self._config.columns_max, 1, -1):
+            splits = [bbox.x1 + width * i / num for i in range(1, num)]
+            if all(self._is_empty(profile, x, bbox) for x in splits):
+                bounds = [bbox.x1, *splits, bbox.x2]
+                return [
+                    (
+                        page.crop((bounds[i], bbox.y1, bounds[i + 1], bbox.y2), strict=False),
+                        num,
+                        "left" if i == 0 else "right" if i == num - 1 else "center",
+                    )
+                    for i in range(num)
+                ]
+
+        return []
+
+    def _get_x_profile(self, page: Page, bbox: PDFTextBox):
+        """
+        Returns the extents of all visible objects (non-blank chars and graphics)
+        which vertically overlap the given box as rows of x0, x1, top, bottom and
+        whether the object is an area, i.e. a rect or an image.
+        """
+        import numpy as np
+
+        objects = [(c, False) for c in page.chars if not c["text"].isspace()]
+        for key in ("line", "rect", "curve", "image"):
+            objects.extend((o, key in ("rect", "image")) for o in page.objects.get(key, []))
+
+        extents = np.array(
+            [
+                (o["x0"], o["x1"], o["top"], o["bottom"], area)
+                for o, area in objects
+                if o["top"] < bbox.y2 and o["bottom"] > bbox.y1
+            ],
+            dtype=float,
+        ).reshape(-1, 5)
+        return extents
+
+    def _is_empty(self, profile, x: float, bbox: PDFTextBox) -> bool:
+        gap = self._config.columns_gap
+        x0, x1, top, bottom, area = profile.T
+        overlaps = (x0 < x + gap) & (x1 > x - gap)
+        # areas like a background fill which cover the whole gap leave it uniform,
+        # just like the rendered gap of the raster detection
+        covers = (area > 0) & (x0 <= x - gap) & (x1 >= x + gap) & (top <= bbox.y1) & (bottom >= bbox.y2)
+        return not (overlaps & ~covers).any()
+
     def _get_two_column_crops(self, page: Page, bbox: PDFTextBox) -> List[Tuple[CroppedPage, int, ColumnPosition]]:
         bbox_center_x = bbox.x1 + (bbox.x2 - bbox.x1) / 2
         gap = page.crop(
             (bbox_center_x-self._config.columns_gap, bbox.y1, bbox_center_x+self._config.columns_gap, bbox.y2),
             strict=False
         )
-        if self._is_monochrome(gap.to_image()):
+        if self._is_monochrome(page_render_cache.to_image(gap)):
             crop_left = page.crop(
                 (bbox.x1, bbox.y1, bbox_center_x, bbox.y2),
                 strict=False
@@ -85,7 +166,7 @@ class ColumnStyleBoundingBoxSlicer:
             for col_x in (bbox_col_x1, bbox_col_x2)
         ]
 
-        if all(self._is_monochrome(gap.to_image()) for gap in gaps):
+        if all(self._is_monochrome(page_render_cache.to_image(gap)) for gap in gaps):
             crop_left = page.crop(
                 (bbox.x1, bbox.y1, bbox_col_x1, bbox.y2),
                 strict=False
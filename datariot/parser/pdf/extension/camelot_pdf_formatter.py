@@ -1,12 +1,18 @@
+import base64
 import os
 import re
+from collections import defaultdict
+from hashlib import sha256
+from typing import Dict, List, Optional, Tuple
 
 import camelot
 import pdfplumber
 
 from datariot.__spi__ import Parsed
 from datariot.__spi__.splitter import Chunk
-from datariot.__util__.image_util import to_base64
+from datariot.__spi__.type import Box
+from datariot.__util__.image_util import get_mime_type, to_bytes
+from datariot.__util__.spatial_util import BoxIndex
 from datariot.__util__.text_util import create_uuid_from_string
 from datariot.parser.pdf import PDFTableBox, PDFTextBox, PDFImageBox
 from datariot.parser.pdf.__spi__ import PDFParserConfig
@@ -28,7 +34,8 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
         expr4 = page_height - box_tuple[1] > box_datariot.y2
         return (expr1 and expr2 and expr3 and expr4)
 
-    def is_overlapping(self, bbox1, bbox2):
+    @staticmethod
+    def is_overlapping(bbox1, bbox2):
         return bbox1.x2 >= bbox2.x1 and bbox2.x2 >= bbox1.x1 and bbox1.y2 >= bbox2.y1 and bbox2.y2 >= bbox1.y1
 
     def find_intersections(self, bbox, otherboxes):
@@ -36,17 +43,6 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
         intersecting_boxes = [resultbox for resultbox in same_page_boxes if self.is_overlapping(bbox, resultbox)]
         return intersecting_boxes
 
-    def find_intersections_recursive(self, bbox, otherboxes):
-        box_list = [bbox]
-        if bbox in otherboxes:
-            otherboxes.remove(bbox)
-        else:
-            return []  # was already processed in other branch of recursion
-        intersecting_boxes = self.find_intersections(bbox, otherboxes)
-        for intersecting_box in intersecting_boxes:
-            box_list.extend(self.find_intersections_recursive(intersecting_box, otherboxes))
-        return box_list
-
     def get_group_bbox(self, group_boxes):
         x1min = group_boxes[0].x1
         y1min = group_boxes[0].y1
@@ -60,10 +56,10 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
         return x1min, y1min, x2max, y2max
 
     def get_page_span(self, input):
-        res = re.findall('!\[pg\]\(\d+\)', input)
+        res = _PAGE_PATTERN.findall(input)
         res_num = [int(x[6:9]) for x in res]
-        for match in res:
-            input = input.replace(match, " ")
+        if res:
+            input = _PAGE_PATTERN.sub(" ", input)
         if len(res_num) == 0:
             return 0, 0, input
         elif len(res_num) == 1:
@@ -71,47 +67,63 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
         else:
             return min(res_num), max(res_num), input
 
+    def get_table_area(self, bbox: PDFTableBox, page_height: float) -> Tuple[float, float, float, float]:
+        offset = 0
+        x1 = bbox.x1 - offset
+        x2 = bbox.x2 + offset
+        y1 = page_height - bbox.y1 - offset
+        y2 = page_height - bbox.y2 + offset
+        return x1, y1, x2, y2
+
+    def read_page_tables(self, path: str, areas_by_page: Dict[int, List[str]]) -> Dict[int, Tuple[list, list]]:
+        """
+        Runs each camelot flavor once per page for all table areas of the page.
+        Pages are processed in worker processes if `parallel.workers > 1`.
+        """
+        workers = min(self.config.parallel.workers, len(areas_by_page))
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    page_number: executor.submit(_read_tables, path, page_number, areas)
+                    for page_number, areas in areas_by_page.items()
+                }
+                return {page_number: future.result() for page_number, future in futures.items()}
+
+        return {
+            page_number: _read_tables(path, page_number, areas)
+            for page_number, areas in areas_by_page.items()
+        }
+
     def process_tables_and_images(self, datariot_result):
-        pdf_reader = pdfplumber.open(datariot_result.path)
+        # a repaired copy is read instead of a broken document
+        file = getattr(datariot_result, "file", None) or datariot_result.path
+        pdf_reader = pdfplumber.open(file)
+
+        table_areas = {}
+        areas_by_page = {}
+        for idx, bbox in enumerate(datariot_result.bboxes):
+            if isinstance(bbox, PDFTableBox):
+                # get page dimensions to get the bounding boxes right
+                page_height = pdf_reader.pages[bbox.page_number - 1].height
+                table_areas[idx] = self.get_table_area(bbox, page_height)
+                areas_by_page.setdefault(bbox.page_number, []).append("{},{},{},{}".format(*table_areas[idx]))
 
-        media_list = []
+        page_tables = self.read_page_tables(file, areas_by_page)
+
+        media = MediaStore(datariot_result.path, self.config.bbox_config.table_box_config.media_path)
         image_boxes_to_delete = []
         processed_tables = []
         for idx, bbox in enumerate(datariot_result.bboxes):
             if isinstance(bbox, PDFTableBox):
-                # get page dimensions to get the bounding boxes right
                 page_height = pdf_reader.pages[bbox.page_number - 1].height
 
-                offset = 0
-                x1 = bbox.x1 - offset
-                x2 = bbox.x2 + offset
-                y1 = page_height - bbox.y1 - offset
-                y2 = page_height - bbox.y2 + offset
-
-                try:  # Try Lattice Schema
-                    tables_lat = camelot.read_pdf(datariot_result.path, pages=str(bbox.page_number), flavor="lattice",
-                                                  flag_size=False, copy_text=["h", "v"], line_scale=60,
-                                                  process_background=False, table_areas=[f"{x1},{y1},{x2},{y2}"])
-                    if len(tables_lat) == 0:
-                        lattice_acc = 0
-                    else:
-                        lattice_acc = tables_lat[0].parsing_report["accuracy"]
-                except Exception:
-                    lattice_acc = 0
-                    tables_lat = []
-
-                try:  # Try Stream Schema
-                    tables_str = camelot.read_pdf(datariot_result.path, pages=str(bbox.page_number), flavor="stream",
-                                                  flag_size=False, row_tol=10, column_tol=10,
-                                                  table_areas=[f"{x1},{y1},{x2},{y2}"])
-                    if len(tables_str) == 0:
-                        # print("Stream failed without tables")
-                        stream_acc = 0
-                    else:
-                        stream_acc = tables_str[0].parsing_report["accuracy"]
-                except Exception:
-                    stream_acc = 0
-                    tables_str = []
+                tables_lat, tables_str = page_tables[bbox.page_number]
+                tables_lat = _find_tables(table_areas[idx], tables_lat)
+                lattice_acc = tables_lat[0].parsing_report["accuracy"] if tables_lat else 0
+                tables_str = _find_tables(table_areas[idx], tables_str)
+                stream_acc = tables_str[0].parsing_report["accuracy"] if tables_str else 0
 
                 if (lattice_acc >= stream_acc) or (lattice_acc > 95.0):
                     tables = tables_lat
@@ -134,19 +146,8 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
                             for img_to_locate in images_within_table:
                                 if self.first_includes_second((tbl_cell.x1, tbl_cell.y1, tbl_cell.x2, tbl_cell.y2),
                                                               img_to_locate, page_height):
-                                    doc_name = create_uuid_from_string(os.path.basename(datariot_result.path))
-                                    img_name = create_uuid_from_string(img_to_locate.to_hash())
-                                    tables[0].df.iloc[row_idx, col_idx] += f"![Abbildung](doc/{doc_name}/{img_name})"
-                                    image_dict = {
-                                        "id": img_name,
-                                        "name": "Abbildung",
-                                        "description": "",
-                                        "source": doc_name,
-                                        "mime_type": "image/webp",
-                                        "content": to_base64(img_to_locate.crop().original).decode("utf-8"),
-                                        "properties": {}
-                                    }
-                                    media_list.append(image_dict)
+                                    img_name = media.add(img_to_locate)
+                                    tables[0].df.iloc[row_idx, col_idx] += f"![Abbildung](doc/{media.doc_name}/{img_name})"
 
                     def repl_newline(x):
                         return str(x).replace('\n', ' ')
@@ -161,31 +162,23 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
                     processed_tables.append(export_table)
 
         # delete image boxes that were within tables
-        for bbox_del in image_boxes_to_delete:
-            datariot_result.bboxes.remove(bbox_del)
+        image_boxes_to_delete = {id(box) for box in image_boxes_to_delete}
+        datariot_result.bboxes[:] = [box for box in datariot_result.bboxes if id(box) not in image_boxes_to_delete]
 
         # Implement Box Merger for Images here
-        boxes_to_process = datariot_result.bboxes.copy()
-        box_groups = []
-        for idx, bbox in enumerate(datariot_result.bboxes):
-            if isinstance(bbox, PDFImageBox) or isinstance(bbox, PDFLineCurveBox):
-                if bbox in boxes_to_process:
-                    intersecting_boxes = self.find_intersections_recursive(bbox, boxes_to_process)
-                    # intersecting_boxes = [bbox] #skip grouping
-                    box_groups.append((bbox, intersecting_boxes))
-
-        group_image_boxes = []
-        for box_origin, box_group in box_groups:
+        box_groups = _group_boxes(datariot_result.bboxes)
+
+        group_image_boxes = set()
+        for idx, box_origin, box_group in box_groups:
             x1, y1, x2, y2 = self.get_group_bbox(box_group)
             newimagebox = PDFImageBox(box_origin.page, data={"x0": x1, "x1": x2, "top": y1, "bottom": y2})
-            if newimagebox.width > self.config.bbox_config.min_image_width and newimagebox.height > self.config.bbox_config.min_image_height:
-                group_image_boxes.append(newimagebox)
-                datariot_result.bboxes[datariot_result.bboxes.index(box_origin)] = newimagebox
+            min_size = self.config.bbox_config.image_filter_box_size
+            if newimagebox.width > (min_size.min_width or 0) and newimagebox.height > (min_size.min_height or 0):
+                group_image_boxes.add(id(newimagebox))
+                datariot_result.bboxes[idx] = newimagebox
 
-        boxes_to_remove = [box for box in datariot_result.bboxes if isinstance(box, PDFLineCurveBox) or (
-                    isinstance(box, PDFImageBox) and (box not in group_image_boxes))]
-        for box in boxes_to_remove:
-            datariot_result.bboxes.remove(box)
+        datariot_result.bboxes[:] = [box for box in datariot_result.bboxes if not (isinstance(box, PDFLineCurveBox) or (
+                isinstance(box, PDFImageBox) and (id(box) not in group_image_boxes)))]
 
         # Check if there are Background Images - if yes append after contained text
         all_page_numbers = sorted(list(set([bx.page_number for bx in datariot_result.bboxes])))
@@ -229,24 +222,13 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
 
         for idx, bbox in enumerate(datariot_result.bboxes):
             if isinstance(bbox, PDFImageBox):
-                doc_name = create_uuid_from_string(os.path.basename(datariot_result.path))
-                img_name = create_uuid_from_string(bbox.to_hash())
-                newtextbox = PDFTextBox(bbox.x1, bbox.y1, bbox.x2, bbox.y2, f"![Abbildung](doc/{doc_name}/{img_name})",
+                img_name = media.add(bbox)
+                newtextbox = PDFTextBox(bbox.x1, bbox.y1, bbox.x2, bbox.y2,
+                                        f"![Abbildung](doc/{media.doc_name}/{img_name})",
                                         font_size=0, font_name="", page_number=bbox.page_number)
-                image_dict = {
-                    "id": img_name,
-                    "name": "Abbildung",
-                    "description": "",
-                    "source": doc_name,
-                    "mime_type": "image/webp",
-                    "content": to_base64(bbox.crop().original).decode("utf-8"),
-                    "properties": {}
-                }
-                media_list.append(image_dict)
                 datariot_result.bboxes[idx] = newtextbox
-                # save_image(f"./output/{doc_name}", bbox)
 
-        return datariot_result, media_list
+        return datariot_result, media.entries()
 
     def process(self):
         # count header levels and reformat to pseudo html
@@ -257,7 +239,8 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
             if b.text.startswith("#"):
                 b._text = " " + b.text  # Hashtag at the beginning of line shall not be misinterpreted as header, therefore space is added
             formatted = b.render(self)
-            m = re.search('^#+', formatted.split(" ")[0])
+            first_word, _, rest = formatted.partition(" ")
+            m = _HEADER_PATTERN.match(first_word)
             if m is None:
                 if b.page_number > running_pagenum:
                     running_pagenum = b.page_number
@@ -266,11 +249,8 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
                     result_formatted.append(formatted)
             else:
                 header_level = len(m.group(0))
-                if header_level in header_counts.keys():
-                    header_counts[header_level] = header_counts[header_level] + 1
-                else:
-                    header_counts[header_level] = 1
-                header_str = (' '.join(formatted.split(' ')[1:])).strip()
+                header_counts[header_level] = header_counts.get(header_level, 0) + 1
+                header_str = rest.strip()
                 if len(header_str) > 0:
                     result_formatted.append(f"<h{header_level}>{header_str}</h{header_level}>")
 
@@ -281,9 +261,9 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
         num_overall_headers = sum(header_counts.values())
         if num_overall_headers > 0:
             for hlevel in range(1, max(header_counts.keys()) + 1):
-                if len(split_hlevel_list) == 0 and header_counts[hlevel] == 1:
+                if len(split_hlevel_list) == 0 and header_counts.get(hlevel) == 1:
                     title_hlevel_list.append(f"<h{hlevel}>")
-                elif header_counts[hlevel] > num_overall_headers * 0.1:
+                elif header_counts.get(hlevel, 0) > num_overall_headers * 0.1:
                     split_hlevel_list.append(f"<h{hlevel}>")
                 else:
                     no_split_hlevel_list.append(f"<h{hlevel}>")
@@ -291,58 +271,48 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
             pass
 
         # extract title / remaining text is corpus
-        title = ""
-        text_corpus = ""
+        title_parts = []
+        corpus_parts = []
         for textblock in result_formatted:
-            if textblock[0:4] in title_hlevel_list:
-                title = title + textblock[4:-5].replace("\n", "") + " "
-                text_corpus = text_corpus + textblock.replace(textblock[1:4], "p>") + "\n"
-            elif textblock[0:4] in split_hlevel_list:
-                text_corpus = text_corpus + textblock + "\n"
-            elif textblock[0:4] in no_split_hlevel_list:
-                text_corpus = text_corpus + textblock.replace(textblock[1:4], "p>") + "\n"
+            tag = textblock[0:4]
+            if tag in title_hlevel_list:
+                title_parts.append(textblock[4:-5].replace("\n", "") + " ")
+                corpus_parts.append(textblock.replace(textblock[1:4], "p>") + "\n")
+            elif tag in split_hlevel_list:
+                corpus_parts.append(textblock + "\n")
+            elif tag in no_split_hlevel_list:
+                corpus_parts.append(textblock.replace(textblock[1:4], "p>") + "\n")
             else:
-                text_corpus = text_corpus + f"<p>" + textblock + "</p>\n"
+                corpus_parts.append("<p>" + textblock + "</p>\n")
+        title = "".join(title_parts)
+        text_corpus = "".join(corpus_parts)
 
         # apply HTML Header Text Splitter
         html_headers_to_split_on = [(x[1:3], f"Header {num + 1}") for num, x in enumerate(split_hlevel_list)]
         html_splitter = HTMLTagSplitter(tags_to_split_on=html_headers_to_split_on,
                                         return_each_element=False)
-
-        # Pre Split text_corpus since lxml used by HTMLHeaderTextSplitter has max num of headers to process
-        num_splittags_in_corpus = sum([len(list(re.finditer(split_tag, text_corpus))) for split_tag in
-                                       ["<" + x[0] + ">" for x in html_headers_to_split_on + ["p"]]])
-        MAX_PDF_HEADERS = 1000
-        if num_splittags_in_corpus < MAX_PDF_HEADERS:
-            pdf_splits = html_splitter(text_corpus)
-        else:
-            pdf_splits = []
-            pre_split_separators = ["<" + x[0] + ">" for x in html_headers_to_split_on] + ["<p>", "\n\n", "\n",
-                                                                                           ". ", " ", ""]
-            pre_split_chunk_size = int(len(text_corpus) / (num_splittags_in_corpus / MAX_PDF_HEADERS) / 2)
-            pdf_pre_splitter = RecursiveCharacterSplitter(separators=pre_split_separators,
-                                                          chunk_size=pre_split_chunk_size, chunk_overlap=0)
-            pre_split_text_corpus = pdf_pre_splitter.split_text(text_corpus)
-            for pre_split in pre_split_text_corpus:
-                pdf_splits.extend(html_splitter(pre_split))
+        pdf_splits = html_splitter(text_corpus)
 
         rec_text_splitter = RecursiveCharacterSplitter(chunk_size=750, chunk_overlap=0, separators=["\n\n", "\n"])
         pdf_splits_recursive = rec_text_splitter.split_documents(pdf_splits)
 
+        source = os.path.basename(self.parsed_withtblsandimgs.path)
         document_metadata = {
             "Title": title,
-            "source": os.path.basename(self.parsed_withtblsandimgs.path)
+            "source": source
         }
 
-        # Add Metadata and add Header Info to content of each chunk
+        # Add Metadata and add Header Info to content of each chunk, the content of
+        # each page is buffered and joined once the page is complete
         running_page_number = 0
         running_page_content = 0
         running_header_text = ""
-        content = ""
+        content_parts = []
+        content_length = 0
         content_list = []
         for split in pdf_splits_recursive:
             # Fill metadata fields of chunk
-            split.data["source"] = os.path.basename(self.parsed_withtblsandimgs.path)
+            split.data["source"] = source
             split.data["Title"] = title
 
             # Add page number to metadata
@@ -355,52 +325,47 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
             else:
                 split.data["page"] = running_page_number
 
+            header_text = split.data["Title"] + "".join(
+                [f" / {split.data[key]}" for key in _HEADER_KEYS if key in split.data])
+
             # Rebuild content blocks by page
             if split.data["page"] > running_page_content:  # save previous page, start new page
-                if len(content) > 0:  # save content
-                    newchunk = Chunk(text=content, data={"Title": document_metadata["Title"],
-                                                         "source": document_metadata["source"]})
+                if content_length > 0:  # save content
+                    newchunk = Chunk(text="".join(content_parts), data={"Title": document_metadata["Title"],
+                                                                        "source": document_metadata["source"]})
                     newchunk.data["page"] = running_page_content
                     content_list.append(newchunk)
-                else:  # no text, ignore content
-                    pass
                 # new page started
                 running_page_content = split.data["page"]
+                content_parts = []
+                content_length = 0
                 # add correct header info
-                header_text = (split.data["Title"] if "Title" in split.data.keys() else "") + "".join(
-                    [f" / {x}" for x in
-                     [split.data[f"Header {k}"] for k in range(0, 10) if f"Header {k}" in split.data.keys()]])
                 if running_header_text == header_text:
-                    content = ""
-                    pass  # Same header, no need to print again
+                    prefix = ""  # Same header, no need to print again
                 else:
                     running_header_text = header_text
-                    content = header_text + "\n\n"
-                # add content
-                content = content + split.text
+                    prefix = header_text + "\n\n"
                 split.data["offset"] = 0
             else:  # same page
-                split.data["offset"] = len(content) + 1
+                split.data["offset"] = content_length + 1
                 # add corrent header info
-                header_text = (split.data["Title"] if "Title" in split.data.keys() else "") + "".join(
-                    [f" / {x}" for x in
-                     [split.data[f"Header {k}"] for k in range(0, 10) if f"Header {k}" in split.data.keys()]])
                 if running_header_text == header_text:
-                    content = content + "\n"
+                    prefix = "\n"
                 else:
                     running_header_text = header_text
-                    content = content + "\n\n" + header_text + "\n\n"
-                content = content + split.text
+                    prefix = "\n\n" + header_text + "\n\n"
+            # add content
+            content_parts.append(prefix + split.text)
+            content_length += len(prefix) + len(split.text)
 
             # Add Title and Header Info to content and update chunk-text
-            add_info = "Title: " + split.data["Title"] + "\n"
-            htaglist = [x for x in split.data.keys() if x.startswith("Header")]
-            for thishtag in htaglist:
-                add_info = add_info + thishtag + ": " + split.data[thishtag] + "\n"
-            split.text = add_info + split.text
-
-        if len(content) > 0:  # save content
-            newchunk = Chunk(text=content, data=document_metadata)
+            add_info = ["Title: " + split.data["Title"] + "\n"]
+            for thishtag in [x for x in split.data.keys() if x.startswith("Header")]:
+                add_info.append(thishtag + ": " + split.data[thishtag] + "\n")
+            split.text = "".join(add_info) + split.text
+
+        if content_length > 0:  # save content
+            newchunk = Chunk(text="".join(content_parts), data=document_metadata)
             newchunk.data["page"] = running_page_content
             content_list.append(newchunk)
 
@@ -409,6 +374,132 @@ class CamelotPDFFormatter(HeuristicPDFFormatter):
         full_doc_chunks["content"] = content_list
 
         full_document = {}
-        full_document[os.path.basename(self.parsed_withtblsandimgs.path)] = full_doc_chunks
+        full_document[source] = full_doc_chunks
 
         return pdf_splits_recursive, full_document, self.media_list
+
+
+_HEADER_PATTERN = re.compile("#+")
+_PAGE_PATTERN = re.compile(r"!\[pg\]\(\d+\)")
+_HEADER_KEYS = [f"Header {k}" for k in range(0, 10)]
+
+
+class MediaStore:
+    """
+    Media items of a document keyed by the hash of their content. Each image is
+    encoded once and identical images share a single entry.
+    """
+
+    def __init__(self, path: str, media_path: Optional[str] = None):
+        self.doc_name = create_uuid_from_string(os.path.basename(path))
+        self.media_path = media_path
+        self._entries: Dict[str, dict] = {}
+
+    def add(self, box: PDFImageBox) -> str:
+        image = box.get_image()
+        payload = to_bytes(image)
+        encoded = base64.b64encode(payload)
+        # same id as create_uuid_from_string(box.to_hash())
+        img_name = create_uuid_from_string(sha256(encoded).hexdigest())
+
+        if img_name not in self._entries:
+            entry = {
+                "id": img_name,
+                "name": "Abbildung",
+                "description": "",
+                "source": self.doc_name,
+                "mime_type": get_mime_type(image),
+            }
+            if self.media_path is None:
+                entry["content"] = encoded.decode("utf-8")
+            else:
+                # the payload is streamed to disk, the entry only refers to the file
+                extension = (image.format or "webp").lower()
+                path = os.path.join(self.media_path, self.doc_name, f"{img_name}.{extension}")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as file:
+                    file.write(payload)
+                entry["path"] = path
+            entry["properties"] = {}
+            self._entries[img_name] = entry
+
+        box.release()
+        return img_name
+
+    def entries(self) -> List[dict]:
+        return list(self._entries.values())
+
+
+def _read_tables(path: str, page_number: int, areas: List[str]) -> Tuple[list, list]:
+    try:  # Try Lattice Schema
+        tables_lat = list(camelot.read_pdf(path, pages=str(page_number), flavor="lattice", flag_size=False,
+                                           copy_text=["h", "v"], line_scale=60, process_background=False,
+                                           table_areas=areas))
+    except Exception:
+        tables_lat = []
+
+    try:  # Try Stream Schema
+        tables_str = list(camelot.read_pdf(path, pages=str(page_number), flavor="stream", flag_size=False,
+                                           row_tol=10, column_tol=10, table_areas=areas))
+    except Exception:
+        tables_str = []
+
+    return tables_lat, tables_str
+
+
+def _find_tables(area: Tuple[float, float, float, float], tables: list) -> list:
+    """Returns the table camelot extracted for the given area of a page if there is one."""
+    x1, y1, x2, y2 = area
+
+    def _overlap(table) -> float:
+        tx1, ty1, tx2, ty2 = table._bbox
+        width = min(x2, tx2) - max(x1, tx1)
+        height = min(y1, ty2) - max(y2, ty1)
+        return width * height if width > 0 and height > 0 else 0
+
+    overlaps = [_overlap(table) for table in tables]
+    if not overlaps or max(overlaps) == 0:
+        return []
+
+    return [tables[overlaps.index(max(overlaps))]]
+
+
+def _group_boxes(bboxes: List[Box]) -> List[Tuple[int, Box, List[Box]]]:
+    """
+    Groups each image and line box with all boxes of its page which overlap it
+    directly or transitively. The groups are the connected components of the
+    overlap graph, which are built with a union-find over a spatial index of each
+    page. Each group is returned with its first image or line box and the index
+    of that box.
+    """
+    parents = list(range(len(bboxes)))
+
+    def _find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    pages = defaultdict(list)
+    for i, box in enumerate(bboxes):
+        pages[box.page_number].append(i)
+
+    for indices in pages.values():
+        page_boxes = [bboxes[i] for i in indices]
+        index = BoxIndex(page_boxes)
+        for j, box in enumerate(page_boxes):
+            for k in index.query_box(box):
+                other = page_boxes[k]
+                if k > j and CamelotPDFFormatter.is_overlapping(box, other):
+                    parents[_find(indices[k])] = _find(indices[j])
+
+    members = defaultdict(list)
+    for i, box in enumerate(bboxes):
+        members[_find(i)].append(box)
+
+    groups = []
+    for i, box in enumerate(bboxes):
+        if isinstance(box, (PDFImageBox, PDFLineCurveBox)) and _find(i) in members:
+            groups.append((i, box, members.pop(_find(i))))
+
+    return groups
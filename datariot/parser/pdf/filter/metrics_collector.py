@@ -1,45 +1,109 @@
-from math import ceil
+from collections import Counter
+from math import ceil, sqrt
+from typing import List, Literal
 
 from pdfplumber.page import Page
 
+MetricsMode = Literal["off", "counts", "full", "coverage"]
+
 
 class MetricsCollector:
+    """
+    Collects the metrics of a parsed page from its layout objects. `counts` counts
+    the objects per tag and stroking color, `full` additionally measures the pixels
+    which are covered by more than one object, `coverage` measures them in one pass
+    independently of the object order instead and `off` collects nothing.
+    """
+
+    def __init__(self, mode: MetricsMode = "full"):
+        self.mode = mode
+
+    def __call__(self, page: Page) -> dict:
+        if self.mode == "off":
+            return {}
 
-    def __init__(self, page: Page):
-        import numpy as np
-        _, _, max_x, max_y = page.bbox
-        self.array = np.zeros((ceil(max_x), ceil(max_y)), dtype=np.byte)
+        objects = [obj for objs in page.objects.values() for obj in objs]
+        metrics = {
+            "tags": dict(Counter(obj.get("tag", "None") for obj in objects)),
+            "stroking_colors": dict(Counter(obj.get("stroking_color", "None") for obj in objects)),
+        }
+        if self.mode == "full":
+            metrics["overlapping_pixels"] = get_overlapping_pixels(page, objects)
+        elif self.mode == "coverage":
+            metrics["overlapping_coverage"] = get_overlapping_coverage(page, objects)
 
-        self.max_x = max_x
-        self.max_y = max_y
+        return metrics
 
-        self.tags = {}
-        self.stroking_color = {}
-        self.overlapping_pixels = 0
 
-    def __call__(self, obj) -> bool:
-        import numpy as np
-        tag = obj.get("tag", "None")
-        color = obj.get("stroking_color", "None")
+_MAX_RASTER_PIXELS = 1 << 22
+"""Larger pages are measured on a proportionally downscaled raster"""
 
-        if tag not in self.tags:
-            self.tags[tag] = 0
-        self.tags[tag] += 1
 
-        if color not in self.stroking_color:
-            self.stroking_color[color] = 0
-        self.stroking_color[color] += 1
+def get_overlapping_pixels(page: Page, objects: List[dict]) -> int:
+    """
+    Paints the objects in their order and sums up the painted pixels within each
+    object which overlaps the ones painted before it. Overlapping objects are not
+    painted themselves, so the result depends on the order of the objects.
+    """
+    import numpy as np
 
+    _, _, max_x, max_y = page.bbox
+    painted = np.zeros((ceil(max_x), ceil(max_y)), dtype=np.bool_)
+
+    overlapping = 0
+    for obj in objects:
         x0 = ceil(obj["x0"])
         x1 = ceil(obj["x1"])
-        y0 = ceil(self.max_y - obj["y0"])
-        y1 = ceil(self.max_y - obj["y1"])
+        y0 = ceil(max_y - obj["y0"])
+        y1 = ceil(max_y - obj["y1"])
+
+        # the first column is left out to tolerate neighbouring glyphs which share it
+        count = np.count_nonzero(painted[x0 + 1:x1, y1:y0])
+        if count > 0:
+            overlapping += count
+        else:
+            painted[x0:x1, y1:y0] = True
+
+    return overlapping
+
+
+def get_overlapping_coverage(page: Page, objects: List[dict]) -> int:
+    """
+    Sums up how often each pixel of the page is covered by more than one object,
+    i.e. a pixel covered by n objects counts n - 1 times. The coverage of all
+    objects is computed at once from a difference array, so unlike
+    `get_overlapping_pixels` the result does not depend on the object order.
+    """
+    import numpy as np
+
+    if not objects:
+        return 0
+
+    _, _, max_x, max_y = page.bbox
+    scale = min(1.0, sqrt(_MAX_RASTER_PIXELS / max(ceil(max_x) * ceil(max_y), 1)))
+    width, height = ceil(max_x * scale), ceil(max_y * scale)
+
+    coords = np.array(
+        [(obj["x0"], obj["x1"], max_y - obj["y1"], max_y - obj["y0"]) for obj in objects]
+    )
+    coords = np.ceil(coords * scale).astype(np.int64)
+    # the first column is left out to tolerate neighbouring glyphs which share it
+    x0, x1 = np.clip(coords[:, 0] + 1, 0, width), np.clip(coords[:, 1], 0, width)
+    y0, y1 = np.clip(coords[:, 2], 0, height), np.clip(coords[:, 3], 0, height)
+
+    visible = (x0 < x1) & (y0 < y1)
+    x0, x1, y0, y1 = x0[visible], x1[visible], y0[visible], y1[visible]
 
-        subset = self.array[x0+1:x1, y1:y0]
+    diff = np.zeros((width + 1, height + 1), dtype=np.int32)
+    np.add.at(diff, (x0, y0), 1)
+    np.add.at(diff, (x1, y0), -1)
+    np.add.at(diff, (x0, y1), -1)
+    np.add.at(diff, (x1, y1), 1)
 
-        if 1 in subset:
-            self.overlapping_pixels += np.count_nonzero(subset)
-            return True
+    # the prefix sums turn the difference array into the number of objects per pixel
+    coverage = np.cumsum(diff, axis=0, out=diff)
+    coverage = np.cumsum(coverage, axis=1, out=coverage)
+    overlapping = int(coverage.sum(dtype=np.int64) - np.count_nonzero(coverage))
 
-        self.array[x0:x1, y1:y0] = 1
-        return True
+    # pixels of a downscaled raster stand for 1 / scale² pixels of the page
+    return round(overlapping / (scale * scale))
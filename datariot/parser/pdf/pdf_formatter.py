@@ -1,4 +1,3 @@
-from copy import copy
 from dataclasses import asdict
 from typing import Callable, List, Tuple
 
@@ -103,7 +102,7 @@ class HeuristicPDFFormatter(Formatter[str]):
 
 class JSONPDFFormatter(Formatter[dict]):
     def __call__(self, box: Box) -> dict:
-        data = copy(box.__dict__)
+        data = box.__getstate__()
         data["type"] = box.__class__.__name__
 
         if isinstance(box, PDFTextBox):
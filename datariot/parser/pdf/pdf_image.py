@@ -0,0 +1,114 @@
+import logging
+from io import BytesIO
+from typing import Iterable, Optional, Set
+
+from PIL import Image as PILImage
+from PIL.Image import Image
+from pdfminer.layout import LTContainer, LTFigure, LTImage
+from pdfminer.pdfcolor import LITERAL_DEVICE_GRAY, LITERAL_DEVICE_RGB
+from pdfminer.pdftypes import (
+    LITERALS_ASCII85_DECODE,
+    LITERALS_ASCIIHEX_DECODE,
+    LITERALS_DCT_DECODE,
+    LITERALS_FLATE_DECODE,
+    LITERALS_JPX_DECODE,
+    LITERALS_LZW_DECODE,
+    LITERALS_RUNLENGTH_DECODE,
+    resolve1,
+)
+from pdfminer.psparser import LIT
+from pdfplumber.page import Page
+
+
+LITERAL_ICC_BASED = LIT("ICCBased")
+
+_RAW_FILTERS = (
+    LITERALS_FLATE_DECODE
+    + LITERALS_LZW_DECODE
+    + LITERALS_ASCII85_DECODE
+    + LITERALS_ASCIIHEX_DECODE
+    + LITERALS_RUNLENGTH_DECODE
+)
+
+
+def decode_embedded_image(data: dict) -> Optional[Image]:
+    """
+    Decodes a plain embedded bitmap of a pdfplumber image object directly from its
+    XObject stream. Returns None for images which have to be rendered instead, e.g.
+    masked images or unsupported filters and color spaces.
+    """
+    stream = data.get("stream")
+    if stream is None or data.get("imagemask"):
+        return None
+    if any(stream.get_any((k,)) is not None for k in ("SMask", "Mask", "Decode")):
+        return None
+
+    try:
+        filters = [f for f, _ in stream.get_filters()]
+
+        if len(filters) == 1 and filters[0] in LITERALS_DCT_DECODE + LITERALS_JPX_DECODE:
+            image = PILImage.open(BytesIO(stream.get_rawdata()))
+            image.load()
+            # adobe cmyk jpegs are stored inverted, leave them to the renderer
+            return image if image.mode in ("L", "RGB") else None
+
+        mode = _get_raw_mode(data)
+        if mode is None or not all(f in _RAW_FILTERS for f in filters):
+            return None
+
+        width, height = data["srcsize"]
+        size = width * height * len(mode)
+        raw = stream.get_data()
+        if len(raw) < size:
+            return None
+
+        return PILImage.frombytes(mode, (width, height), raw[:size])
+    except Exception as ex:
+        logging.debug(f"cannot decode embedded image {data.get('name')}: {ex}")
+        return None
+
+
+def get_upright_images(page: Page) -> Set[int]:
+    """
+    Returns the ids of the image streams which are only drawn upright on the page,
+    i.e. with an axis-aligned, positively scaled transformation on an unrotated page.
+    Decoded pixels of other images do not match their rendering.
+    """
+    if page.rotation != 0:
+        return set()
+
+    upright, skewed = set(), set()
+    for figure, image in _iter_images(page.layout, None):
+        # pdfminer wraps every image into a figure with the current transformation
+        a, b, c, d, _, _ = figure.matrix if figure is not None else (0, 0, 0, 0, 0, 0)
+        key = id(image.stream)
+        if a > 0 and d > 0 and b == 0 and c == 0:
+            upright.add(key)
+        else:
+            skewed.add(key)
+
+    return upright - skewed
+
+
+def _iter_images(container: LTContainer, figure: Optional[LTFigure]) -> Iterable[tuple]:
+    for obj in container:
+        if isinstance(obj, LTImage):
+            yield figure, obj
+        elif isinstance(obj, LTContainer):
+            yield from _iter_images(obj, obj if isinstance(obj, LTFigure) else figure)
+
+
+def _get_raw_mode(data: dict) -> Optional[str]:
+    colorspace = data.get("colorspace") or []
+    if data.get("bits") != 8 or len(colorspace) != 1:
+        return None
+
+    colorspace = resolve1(colorspace[0])
+    if colorspace == LITERAL_DEVICE_RGB:
+        return "RGB"
+    if colorspace == LITERAL_DEVICE_GRAY:
+        return "L"
+    if isinstance(colorspace, list) and len(colorspace) == 2 and colorspace[0] == LITERAL_ICC_BASED:
+        return {1: "L", 3: "RGB"}.get(resolve1(colorspace[1]).get("N"))
+
+    return None
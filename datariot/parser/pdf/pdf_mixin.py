@@ -1,6 +1,6 @@
 import logging
-import sys
-from typing import List, Tuple, Union
+from concurrent.futures import Future
+from typing import List, Optional, Tuple, Union
 from uuid import uuid4
 
 from pdfminer.pdfdocument import PDFDocument
@@ -8,7 +8,9 @@ from pdfplumber.page import Page
 
 from datariot.__spi__.const import HEIGHT, LEFT, TEXT, TOP, WIDTH
 from datariot.__spi__.type import Box
-from datariot.parser.pdf.__spi__ import BBoxConfig, PDFParserConfig
+from datariot.__util__.geometric_util import get_union_area
+from datariot.__util__.spatial_util import BoxIndex
+from datariot.parser.pdf.__spi__ import BBoxConfig, OcrConfig, PDFParserConfig, TableBoxConfig
 from datariot.parser.pdf.bbox.bbox_filter import (
     BoxIdentityBoundingBoxFilter,
     BoxSizeBoundingBoxFilter,
@@ -28,6 +30,7 @@ from datariot.parser.pdf.bbox.bbox_processor import (
 )
 from datariot.parser.pdf.bbox.bbox_slicer import ColumnStyleBoundingBoxSlicer
 from datariot.parser.pdf.bbox.bbox_sorter import CoordinatesBoundingBoxSorter
+from datariot.parser.pdf.pdf_image import get_upright_images
 from datariot.parser.pdf.pdf_model import (
     PDFImageBox,
     PDFLineCurveBox,
@@ -35,28 +38,47 @@ from datariot.parser.pdf.pdf_model import (
     PDFTableBox,
     PDFTextBox,
 )
+from datariot.parser.pdf.pdf_ocr import OcrCache, OcrExecutor, PendingResult, submit_tesseract
+from datariot.parser.pdf.pdf_render import page_render_cache
 
 
 # noinspection PyMethodMayBeStatic
 class PageMixin:
+    ocr_cache: Optional[OcrCache] = None
+
     def get_boxes(self, document: PDFDocument, page: Page, config: PDFParserConfig):
+        return self.submit_boxes(document, page, config).result()
+
+    def submit_boxes(
+        self,
+        document: PDFDocument,
+        page: Page,
+        config: PDFParserConfig,
+        ocr_executor: Optional[OcrExecutor] = None,
+    ) -> PendingResult[List[Box]]:
+        """
+        Extracts the boxes of the page, the ocr of its image boxes is submitted to
+        the executor and the page is completed once their results are available.
+        """
         box_sorter = CoordinatesBoundingBoxSorter(config.bbox_config)
 
         tables = self.get_table_boxes(document, page, config)
         texts = self.get_text_boxes(
             document, page.filter(self.not_within_bboxes(tables)), config
         )
-        images, ocr_texts = self.get_image_boxes(document, page, config)
+        pending_images = self.submit_image_boxes(document, page, config, ocr_executor)
         linecurves = self.get_linecurve_boxes(
             document, page.filter(self.not_within_bboxes(tables, margin=2)), config
         )
 
-        images = self.get_merged_image_boxes(page, images, linecurves, config)
+        def _complete():
+            images, ocr_texts = pending_images.result()
+            images = self.get_merged_image_boxes(page, images, linecurves, config)
 
-        boxes = tables + texts + ocr_texts + images
-        boxes = box_sorter(page, boxes)
+            boxes = tables + texts + ocr_texts + images
+            return box_sorter(page, boxes)
 
-        return boxes
+        return PendingResult(pending_images.futures, _complete)
 
     def get_text_boxes(
         self, document: PDFDocument, page: Page, config: PDFParserConfig
@@ -84,7 +106,7 @@ class PageMixin:
         boxes = annotation_processor(page, boxes)
         boxes = box_filter(page, boxes)
         boxes = box_merger(page, boxes)
-        boxes = box_slicer(page, boxes)
+        boxes = box_slicer(page, boxes, words)
         boxes = toc_filter(page, boxes)
         boxes = pos_filter(page, boxes)
         boxes = txt_filter(page, boxes)
@@ -108,51 +130,106 @@ class PageMixin:
             "horizontal_strategy": table_config.horizontal_strategy,
         }
 
-        kwargs = {"strict": True} if sys.version_info >= (3, 10) else {}
+        if not self.has_table_edges(page, table_config):
+            return []
 
-        boxes = [
-            PDFTableBox(page, e)
-            for e in zip(page.find_tables(ts), page.extract_tables(ts), **kwargs)
-        ]
+        # extract the rows from the found tables instead of running the table
+        # finder a second time via page.extract_tables
+        boxes = [PDFTableBox(page, (e, e.extract())) for e in page.find_tables(ts)]
         boxes = [e for e in boxes if len(e) > 1]
         boxes = box_filter(page, boxes)
 
         return boxes
 
+    def has_table_edges(self, page: Page, table_config: TableBoxConfig) -> bool:
+        """
+        Line based table strategies derive the table cells from the ruling lines,
+        rects and curves of a page, without any of them no table can be found.
+        """
+        strategies = (table_config.vertical_strategy, table_config.horizontal_strategy)
+        if not all(e.startswith("lines") for e in strategies):
+            return True
+
+        objects = page.objects
+        return any(objects.get(e) for e in ("line", "rect", "curve"))
+
+    def is_scanned_page(self, page: Page, ocr_config: OcrConfig) -> bool:
+        """
+        Pages with hardly any extractable text whose area is mostly covered by
+        images are considered as scans.
+        """
+        chars = sum(1 for c in page.chars if not c["text"].isspace())
+        if chars > ocr_config.scan_max_chars or not page.images:
+            return False
+
+        import numpy as np
+
+        # the union of the images is measured on the grid of their coordinates,
+        # a raster of the page would grow with its size
+        x0, top, x1, bottom = page.bbox
+        rects = np.array([(e["x0"], e["top"], e["x1"], e["bottom"]) for e in page.images], dtype=np.float64)
+        rects[:, [0, 2]] = rects[:, [0, 2]].clip(x0, x1)
+        rects[:, [1, 3]] = rects[:, [1, 3]].clip(top, bottom)
+
+        area = (x1 - x0) * (bottom - top)
+        return area > 0 and get_union_area(rects) / area >= ocr_config.scan_min_image_coverage
+
     def get_image_boxes(
         self, document: PDFDocument, page: Page, config: PDFParserConfig
     ) -> Tuple[List[PDFImageBox], List[PDFTextBox]]:
+        return self.submit_image_boxes(document, page, config).result()
+
+    def submit_image_boxes(
+        self,
+        document: PDFDocument,
+        page: Page,
+        config: PDFParserConfig,
+        ocr_executor: Optional[OcrExecutor] = None,
+    ) -> PendingResult[Tuple[List[PDFImageBox], List[PDFTextBox]]]:
         if not config.include_images:
-            return [], []
+            return PendingResult.of(([], []))
 
         identity_filter = BoxIdentityBoundingBoxFilter()
         size_filter = BoxSizeBoundingBoxFilter(config.bbox_config.image_filter_box_size)
+        embedded = config.bbox_config.image_extraction == "embedded"
+        # rotated or flipped images are rendered, their decoded pixels are not upright
+        upright = get_upright_images(page) if embedded else set()
 
         images = page.images
         img_boxes: List[PDFImageBox] = []
         for img in images:
             id_ = str(uuid4()) if config.bbox_config.media_use_uuid else None
-            img_boxes.append(PDFImageBox(page, img, id_))
+            is_upright = id(img.get("stream")) in upright
+            img_boxes.append(PDFImageBox(page, img, id_, img if is_upright else None))
 
         img_boxes = size_filter(page, img_boxes)
         img_boxes = identity_filter(page, img_boxes)
 
-        # TODO: only ocr full page images, i.e., scans
-        text_boxes: List[PDFTextBox] = []
-        if config.ocr:
+        if not config.ocr:
+            return PendingResult.of((img_boxes, []))
+
+        ocr_config = config.bbox_config.ocr_config
+        if ocr_config.only_scanned_pages and not self.is_scanned_page(page, ocr_config):
+            return PendingResult.of((img_boxes, []))
+
+        tasks = [
+            (box, self.submit_ocr(document, page, box, config.bbox_config, ocr_executor))
+            for box in img_boxes
+        ]
+
+        def _complete():
             keep_img_boxes = []
-            for box in img_boxes:
-                ocr_boxes = self.get_text_boxes_by_ocr(
-                    document, page, box, config.bbox_config
-                )
+            text_boxes: List[PDFTextBox] = []
+            for box, task in tasks:
+                ocr_boxes = task.result()
                 if not ocr_boxes or config.bbox_config.ocr_config.keep_image_box:
                     keep_img_boxes.append(box)
 
                 text_boxes.extend(ocr_boxes)
 
-            img_boxes = keep_img_boxes
+            return keep_img_boxes, text_boxes
 
-        return img_boxes, text_boxes
+        return PendingResult([f for _, task in tasks for f in task.futures], _complete)
 
     def get_linecurve_boxes(
         self, document: PDFDocument, page: Page, config: PDFParserConfig
@@ -220,82 +297,106 @@ class PageMixin:
         box: PDFImageBox,
         config: BBoxConfig,
     ) -> List[PDFTextBox]:
-        import pytesseract
+        return self.submit_ocr(document, page, box, config).result()
 
+    def submit_ocr(
+        self,
+        document: PDFDocument,
+        page: Page,
+        box: PDFImageBox,
+        config: BBoxConfig,
+        ocr_executor: Optional[OcrExecutor] = None,
+    ) -> PendingResult[List[PDFTextBox]]:
         if config.ocr_config.only_full_page:
             if (box.width < page.width - 20) and (box.height < page.height - 20):
                 # smaller than either page width or height with 20 px margin
-                return []
+                return PendingResult.of([])
 
             if config.ocr_config.full_page_only_if_no_text:
-                text = page.crop(tuple(box), strict=False).extract_text().strip()
-                if text:
-                    return []
+                chars = page.crop(tuple(box), strict=False).chars
+                if any(not c["text"].isspace() for c in chars):
+                    return PendingResult.of([])
 
-        if config.ocr_config.strategy == "text":
-            text = pytesseract.image_to_string(
-                box.get_file()[1],
-                lang="+".join(config.ocr_config.languages),
-                config=config.ocr_config.tesseract_config,
+        if config.ocr_config.strategy not in ("text", "data"):
+            raise ValueError(
+                f"OCR strategy {config.ocr_config.strategy} is not defined."
             )
 
-            # FIXME: determine font size and name
-            return [
-                PDFTextBox(
-                    box.x1,
-                    box.y1,
-                    box.x2,
-                    box.y2,
-                    text,
-                    font_size=-1,
-                    font_name="",
-                    page_number=box.page_number,
-                )
-            ]
+        cache_key = None
+        cached = None
+        if self.ocr_cache is not None:
+            cache_key = self.ocr_cache.get_key(box.to_hash(), config.ocr_config)
+            cached = self.ocr_cache.get(cache_key)
 
-        elif config.ocr_config.strategy == "data":
-            box_merger = CoordinatesBoundingBoxMerger(config)
-            box_filter = CoordinatesBoundingBoxFilter(config)
-            box_sorter = CoordinatesBoundingBoxSorter(config)
-            toc_filter = PDFOutlinesBoundingBoxFilter(document)
-
-            dicts = pytesseract.image_to_data(
-                box.get_file()[1],
-                output_type=pytesseract.Output.DICT,
-                lang="+".join(config.ocr_config.languages),
-                config=config.ocr_config.tesseract_config,
-            )
-            ocr_boxes = zip(
-                dicts[LEFT],
-                dicts[TOP],
-                dicts[WIDTH],
-                dicts[HEIGHT],
-                dicts[TEXT],
-                [page.page_number] * len(dicts[LEFT]),
-                strict=True,
-            )
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+        else:
+            future = submit_tesseract(box.get_file()[1], config.ocr_config, ocr_executor)
 
-            boxes = [PDFOcrBox.from_ocr(e) for e in ocr_boxes]
-            boxes = [e for e in boxes if len(e.text) > 0]
-            boxes = box_sorter(page, boxes)
-            boxes = box_merger(page, boxes)
-            boxes = toc_filter(page, boxes)
-            boxes = box_filter(page, boxes)
-            boxes = [
-                e
-                for e in boxes
-                if len(e.text.strip()) >= config.ocr_config.filter_box_min_chars
-            ]
+        # the image is held by the ocr task only, not by the box for the whole parse
+        image_ratio = box.image_ratio
+        box.release()
+
+        def _get_result():
+            result = future.result()
+            if cached is None and cache_key is not None:
+                self.ocr_cache.put(cache_key, result)
+            return result
+
+        if config.ocr_config.strategy == "text":
+            def _complete():
+                # FIXME: determine font size and name
+                return [
+                    PDFTextBox(
+                        box.x1,
+                        box.y1,
+                        box.x2,
+                        box.y2,
+                        _get_result(),
+                        font_size=-1,
+                        font_name="",
+                        page_number=box.page_number,
+                    )
+                ]
 
-            return boxes
         else:
-            raise ValueError(
-                f"OCR strategy {config.ocr_config.strategy} is not defined."
-            )
+            def _complete():
+                box_merger = CoordinatesBoundingBoxMerger(config)
+                box_filter = CoordinatesBoundingBoxFilter(config)
+                box_sorter = CoordinatesBoundingBoxSorter(config)
+                toc_filter = PDFOutlinesBoundingBoxFilter(document)
+
+                dicts = _get_result()
+                ocr_boxes = zip(
+                    dicts[LEFT],
+                    dicts[TOP],
+                    dicts[WIDTH],
+                    dicts[HEIGHT],
+                    dicts[TEXT],
+                    [page.page_number] * len(dicts[LEFT]),
+                    strict=True,
+                )
+
+                boxes = [PDFOcrBox.from_ocr(e, image_ratio) for e in ocr_boxes]
+                boxes = [e for e in boxes if len(e.text) > 0]
+                boxes = box_sorter(page, boxes)
+                boxes = box_merger(page, boxes)
+                boxes = toc_filter(page, boxes)
+                boxes = box_filter(page, boxes)
+                boxes = [
+                    e
+                    for e in boxes
+                    if len(e.text.strip()) >= config.ocr_config.filter_box_min_chars
+                ]
+
+                return boxes
+
+        return PendingResult([future], _complete)
 
     def take_screenshot(self, page: Page, bboxes: List[Box]):
         try:
-            image = page.to_image()
+            image = page_render_cache.to_image(page)
             for bbox in bboxes:
                 color = (100, 100, 100)
                 image.draw_rect(
@@ -308,17 +409,28 @@ class PageMixin:
             logging.warning(ex)
 
     def not_within_bboxes(self, bboxes: List[Box], margin: int = 0):
+        if not bboxes:
+            return lambda _: True
+
+        index = BoxIndex(bboxes)
+
         def _not_within_bboxes(obj: dict):
-            def obj_in_bbox(_bbox):
-                v_mid = (obj["top"] + obj["bottom"]) / 2
-                h_mid = (obj["x0"] + obj["x1"]) / 2
-                return (
+            v_mid = (obj["top"] + obj["bottom"]) / 2
+            h_mid = (obj["x0"] + obj["x1"]) / 2
+
+            candidates = index.query(
+                h_mid - margin, v_mid - margin, h_mid + margin, v_mid + margin
+            )
+            for idx in candidates:
+                _bbox = bboxes[idx]
+                if (
                     (h_mid >= _bbox.x1 - margin)
                     and (h_mid < _bbox.x2 + margin)
                     and (v_mid >= _bbox.y1 - margin)
                     and (v_mid < _bbox.y2 + margin)
-                )
+                ):
+                    return False
 
-            return not any(obj_in_bbox(__bbox) for __bbox in bboxes)
+            return True
 
         return _not_within_bboxes
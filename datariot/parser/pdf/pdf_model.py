@@ -5,16 +5,22 @@ from PIL.Image import Image
 from pdfplumber.page import Page
 from pdfplumber.table import Table
 
-from datariot.__spi__.type import Box, ColumnPosition, FontWeight, MediaAware
+from datariot.__spi__.type import Box, ColumnPosition, FontWeight, MediaAware, Parsed
 from datariot.__util__.image_util import to_base64
 from datariot.__util__.text_util import create_uuid_from_string
 from datariot.parser.__spi__ import Font, FontAware, TextAware
+from datariot.parser.pdf.pdf_image import decode_embedded_image
+from datariot.parser.pdf.pdf_render import page_render_cache
 
 DEFAULT_IMAGE_RESOLUTION = 72
 IMAGE_RESOLUTION = 400
+_RENDER_RATIO = (
+    IMAGE_RESOLUTION / DEFAULT_IMAGE_RESOLUTION,
+    IMAGE_RESOLUTION / DEFAULT_IMAGE_RESOLUTION,
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class PDFTextBoxAnnotation:
     start_idx: int
     end_idx: int
@@ -22,6 +28,9 @@ class PDFTextBoxAnnotation:
 
 
 class PDFTextBox(Box, FontAware, TextAware):
+    # slotted, a large document yields hundreds of thousands of word boxes
+    __slots__ = ("_text", "_font_size", "_font_name", "page_number", "hyperlinks")
+
     def __init__(
         self,
         x1: float,
@@ -167,6 +176,8 @@ class PDFTextBox(Box, FontAware, TextAware):
 
 
 class PDFColumnTextBox(PDFTextBox):
+    __slots__ = ("num_columns", "column")
+
     def __init__(
         self,
         x1: float,
@@ -203,46 +214,174 @@ class PDFColumnTextBox(PDFTextBox):
 
 
 class PDFOcrBox(PDFTextBox):
+    __slots__ = ()
+
     def __init__(
         self, x1: int, y1: int, x2: int, y2: int, text: str, page_number: int = -1
     ):
         super().__init__(x1, y1, x2, y2, text, -1, "regular", page_number)
 
     @staticmethod
-    def from_ocr(data):
-        ratio = IMAGE_RESOLUTION / DEFAULT_IMAGE_RESOLUTION
+    def from_ocr(
+        data, ratio: Union[float, Tuple[float, float]] = IMAGE_RESOLUTION / DEFAULT_IMAGE_RESOLUTION
+    ):
         left, top, width, height, text, page_number = data
+        x_ratio, y_ratio = ratio if isinstance(ratio, tuple) else (ratio, ratio)
 
-        x1 = int(left / ratio)
-        y1 = int(top / ratio)
-        x2 = int((left + width) / ratio)
-        y2 = int((top + height) / ratio)
+        x1 = int(left / x_ratio)
+        y1 = int(top / y_ratio)
+        x2 = int((left + width) / x_ratio)
+        y2 = int((top + height) / y_ratio)
         return PDFOcrBox(x1, y1, x2, y2, text, page_number)
 
     def with_text(self, text: str):
         return PDFOcrBox(self.x1, self.y1, self.x2, self.y2, text)
 
 
-class PDFImageBox(Box, MediaAware):
-    def __init__(self, page: Page, data: dict, id: Optional[str] = None):
+class LazyPDFPages:
+    """
+    Page sequence of a parsed pdf document, the file is only opened on first access
+    to one of its pages and stays open until `close` is called.
+    """
+
+    def __init__(self, parsed: Parsed):
+        self._parsed = parsed
+        self._reader = None
+
+    def __getitem__(self, idx: int) -> Page:
+        if self._reader is None:
+            import pdfplumber
+
+            self._reader = pdfplumber.open(getattr(self._parsed, "file", None) or self._parsed.path)
+        return self._reader.pages[idx]
+
+    def close(self):
+        if self._reader is not None:
+            page_render_cache.release_document(self._reader)
+            self._reader.close()
+            self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class PageBoundBox(Box):
+    """
+    Box which keeps a reference to its pdfplumber page, e.g. to crop and render it.
+    The page is detached when the box is pickled and can be re-attached afterwards,
+    either directly or lazily via the page sequence of the document.
+    """
+
+    __slots__ = ("_page", "_page_number", "_pages")
+
+    def __init__(self, page: Page, data: dict):
         super().__init__(data["x0"], data["x1"], data["top"], data["bottom"])
-        self.page = page
-        self._id = id
+        self._page = page
+        self._page_number = page.page_number
+        self._pages = None
+
+    @property
+    def page(self) -> Page:
+        if self._page is None and self._pages is not None:
+            self._page = self._pages[self._page_number - 1]
+        return self._page
 
     @property
     def page_number(self):
-        return self.page.page_number
+        return self._page_number
+
+    def attach(self, page: Union[Page, LazyPDFPages]):
+        if isinstance(page, LazyPDFPages):
+            self._pages = page
+        else:
+            self._page = page
+
+    def __getstate__(self):
+        # pdfplumber pages hold the open file stream and cannot be pickled
+        state = super().__getstate__()
+        state["_page"] = None
+        state["_pages"] = None
+        return state
+
+
+class PDFImageBox(PageBoundBox, MediaAware):
+    __slots__ = ("_id", "_embedded", "_image", "_image_ratio")
+
+    def __init__(
+        self,
+        page: Page,
+        data: dict,
+        id: Optional[str] = None,
+        embedded: Optional[dict] = None,
+    ):
+        super().__init__(page, data)
+        self._id = id
+        self._embedded = embedded
+        self._image: Optional[Image] = None
+        # unknown until the embedded image is decoded
+        self._image_ratio: Optional[Tuple[float, float]] = (
+            None if embedded is not None else _RENDER_RATIO
+        )
 
     @property
     def id(self) -> str:
         return self._id or create_uuid_from_string(self.to_hash(fast=True))
 
+    @property
+    def embedded(self) -> Optional[dict]:
+        """pdfplumber image object of the embedded bitmap represented by this box"""
+        return self._embedded
+
     def crop(self, crop_box: Optional[Box] = None):
         crop_box = crop_box or (self.x1, self.y1, self.x2, self.y2)
-        return self.page.crop(crop_box, strict=False).to_image(
-            resolution=IMAGE_RESOLUTION
+        return page_render_cache.to_image(
+            self.page.crop(crop_box, strict=False), resolution=IMAGE_RESOLUTION
         )
 
+    def get_image(self) -> Image:
+        """
+        Returns the image of the box, decoded directly from the embedded image stream
+        if possible and rendered from the page otherwise. Decoded images are memoized,
+        so hashing, saving and ocr share a single decoding. Rendered images are not
+        kept by the box, the page rendering is shared by the page render cache.
+        """
+        if self._image is not None:
+            return self._image
+
+        if self._image_ratio is None:
+            image = decode_embedded_image(self._embedded)
+            if image is None:
+                self._image_ratio = _RENDER_RATIO
+            else:
+                width, height = self._embedded["width"], self._embedded["height"]
+                if width > 0 and height > 0:
+                    self._image_ratio = (image.width / width, image.height / height)
+                else:
+                    self._image_ratio = _RENDER_RATIO
+                self._image = image
+                return image
+
+        return self.crop().original
+
+    @property
+    def image_ratio(self) -> Tuple[float, float]:
+        """Horizontal and vertical ratio between the pixels of `get_image` and pdf points"""
+        if self._image_ratio is None:
+            self.get_image()
+        return self._image_ratio
+
+    def release(self):
+        if self._image is not None:
+            # decode again on the next access
+            self._image = None
+            self._image_ratio = None
+
     def save(self, crop_box: Optional[Box] = None):
         data = self.crop(crop_box)
         x1, y1, x2, y2 = crop_box or (self.x1, self.y1, self.x2, self.y2)
@@ -251,13 +390,20 @@ class PDFImageBox(Box, MediaAware):
     def __repr__(self):
         return f"x1:{self.x1}, y1:{self.y1}, x2:{self.x2}, y2:{self.y2}"
 
+    def __getstate__(self):
+        # neither the pdfminer stream nor the memoized image are worth pickling
+        state = super().__getstate__()
+        state["_embedded"] = None
+        state["_image"] = None
+        state["_image_ratio"] = _RENDER_RATIO
+        return state
+
     def get_file(self, crop_box: Optional[Box] = None) -> Tuple[str, Image]:
-        # TODO: get image data directly and don't take a screenshot (crop)
-        data = self.crop(crop_box)
+        data = self.get_image() if crop_box is None else self.crop(crop_box).original
         x1, y1, x2, y2 = crop_box or (self.x1, self.y1, self.x2, self.y2)
 
         name = f"image_{self.page_number}_{x1}_{y1}_{x2}_{y2}"
-        return name, data.original
+        return name, data
 
     def to_hash(self, crop_box: Optional[Box] = None, fast: bool = False) -> str:
         from hashlib import sha256
@@ -266,25 +412,19 @@ class PDFImageBox(Box, MediaAware):
             key = f"{self.page_number}:{self.x1}:{self.y1}:{self.x2}:{self.y2}"
             return str(sha256(key.encode("utf-8")).hexdigest())
 
-        data = self.crop(crop_box)
-        encoded = to_base64(data.original)
+        data = self.get_image() if crop_box is None else self.crop(crop_box).original
+        encoded = to_base64(data)
 
         return str(sha256(encoded).hexdigest())
 
 
-class PDFLineCurveBox(Box):
-    def __init__(self, page: Page, data: dict):
-        super().__init__(data["x0"], data["x1"], data["top"], data["bottom"])
-        self.page = page
-
-    @property
-    def page_number(self):
-        return self.page.page_number
+class PDFLineCurveBox(PageBoundBox):
+    __slots__ = ()
 
     def crop(self, crop_box: Optional[Box] = None):
         crop_box = crop_box or (self.x1, self.y1, self.x2, self.y2)
-        return self.page.crop(crop_box, strict=False).to_image(
-            resolution=IMAGE_RESOLUTION
+        return page_render_cache.to_image(
+            self.page.crop(crop_box, strict=False), resolution=IMAGE_RESOLUTION
         )
 
     def __repr__(self):
@@ -297,6 +437,8 @@ class PDFLineCurveBox(Box):
 
 
 class PDFTableBox(Box):
+    __slots__ = ("rows", "page_number")
+
     def __init__(self, page: Page, data: Tuple[Table, List[List[str]]]):
         super().__init__(
             data[0].bbox[0], data[0].bbox[2], data[0].bbox[1], data[0].bbox[3]
@@ -315,6 +457,8 @@ class PDFTableBox(Box):
 
 
 class PDFHyperlinkBox(Box):
+    __slots__ = ("uri", "page_number")
+
     def __init__(self, x1: int, y1: int, x2: int, y2: int, uri: str, page_number: int):
         super().__init__(x1, x2, y1, y2)
         self.uri = uri.replace("&amp;", "&")
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import shlex
+import subprocess
+import threading
+from concurrent.futures import Future
+from io import BytesIO
+from typing import Callable, Generic, List, Optional, TypeVar, Union
+
+from PIL.Image import Image
+
+from datariot.parser.cached_parser import ParseCache
+from datariot.parser.pdf.__spi__ import OcrConfig
+
+T = TypeVar("T")
+
+
+def run_tesseract(image: Image, config: OcrConfig) -> Union[str, dict]:
+    """
+    Runs tesseract on the given image like `pytesseract.image_to_string` (strategy
+    `text`) or `pytesseract.image_to_data` with dict output (strategy `data`), but
+    passes the image and the result via stdin and stdout instead of temp files.
+    """
+    from pytesseract import pytesseract
+
+    image, extension = pytesseract.prepare(image)
+    buffer = BytesIO()
+    image.save(buffer, format=extension)
+
+    args = [pytesseract.tesseract_cmd, "stdin", "stdout"]
+    args += ["-l", "+".join(config.languages)]
+    if config.strategy == "data":
+        args += ["-c", "tessedit_create_tsv=1"]
+    args += shlex.split(config.tesseract_config)
+    if config.strategy == "text":
+        args += ["txt"]
+
+    try:
+        proc = subprocess.run(args, input=buffer.getvalue(), capture_output=True)
+    except FileNotFoundError:
+        raise pytesseract.TesseractNotFoundError()
+
+    if proc.returncode:
+        raise pytesseract.TesseractError(
+            proc.returncode, pytesseract.get_errors(proc.stderr.decode("utf-8"))
+        )
+
+    output = proc.stdout.decode(pytesseract.DEFAULT_ENCODING)
+    if config.strategy == "data":
+        return pytesseract.file_to_dict(output, "\t", -1)
+
+    return output
+
+
+class OcrExecutor:
+    """
+    Bounded pool of tesseract processes. Images of all pages are queued and
+    recognized concurrently while the pages are parsed, at most two images per
+    worker are held in memory at once.
+    """
+
+    def __init__(self, config: OcrConfig):
+        from concurrent.futures import ThreadPoolExecutor
+
+        workers = config.workers or os.cpu_count() or 1
+        self._config = config
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        self._slots = threading.BoundedSemaphore(2 * workers)
+
+    def submit(self, image: Image) -> Future:
+        self._slots.acquire()
+        future = self._pool.submit(run_tesseract, image, self._config)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+class OcrCache(ParseCache):
+    """
+    Persistent cache of tesseract results. Entries are keyed by the content of the
+    image and the tesseract settings, so that results are reused for identical
+    images on other pages or in other documents.
+    """
+
+    def get_key(self, image_hash: str, config: OcrConfig) -> str:
+        key = ":".join(
+            [image_hash, "+".join(config.languages), config.tesseract_config, config.strategy]
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def submit_tesseract(
+    image: Image, config: OcrConfig, executor: Optional[OcrExecutor] = None
+) -> Future:
+    """Submits the image to the executor or runs tesseract right away without one."""
+    if executor is not None:
+        return executor.submit(image)
+
+    future: Future = Future()
+    try:
+        future.set_result(run_tesseract(image, config))
+    except Exception as ex:
+        future.set_exception(ex)
+
+    return future
+
+
+class PendingResult(Generic[T]):
+    """
+    Result which is completed from the outcome of submitted ocr tasks.
+    """
+
+    def __init__(self, futures: List[Future], complete: Callable[[], T]):
+        self.futures = futures
+        self._complete = complete
+
+    @staticmethod
+    def of(value: T) -> "PendingResult[T]":
+        return PendingResult([], lambda: value)
+
+    def done(self) -> bool:
+        return all(e.done() for e in self.futures)
+
+    def result(self) -> T:
+        return self._complete()
@@ -1,13 +1,28 @@
 import logging
 import os
-from typing import Generator, Iterator
+from collections import deque
+from contextlib import nullcontext
+from functools import partial
+from typing import Dict, Generator, Iterable, Iterator, List, Optional, Tuple
 
-from datariot.__spi__.error import DataRiotException, DataRiotImportException
-from datariot.__spi__.type import FileFilter, Parser
+from pdfplumber.page import Page
+
+from datariot.__spi__.error import DataRiotImportException
+from datariot.__spi__.type import Box, FileFilter, Parser
 from datariot.__util__.io_util import get_files
-from datariot.parser.pdf.__spi__ import ParsedPDF, ParsedPDFPage, PDFParserConfig, resilient
+from datariot.__util__.parallel_util import parse_files
+from datariot.parser.pdf.__spi__ import (
+    InspectedPDF,
+    ParsedPDF,
+    ParsedPDFPage,
+    PDFParserConfig,
+    resilient,
+)
 from datariot.parser.pdf.filter.metrics_collector import MetricsCollector
 from datariot.parser.pdf.pdf_mixin import PageMixin
+from datariot.parser.pdf.pdf_model import PageBoundBox
+from datariot.parser.pdf.pdf_ocr import OcrCache, OcrExecutor, PendingResult
+from datariot.parser.pdf.pdf_render import page_render_cache
 
 _DEFAULT_PARSER_CONFIG = PDFParserConfig()
 
@@ -25,84 +40,275 @@ class PDFParser(Parser, PageMixin):
         except ImportError:
             raise DataRiotImportException("ocr")
 
+        ocr_config = config.bbox_config.ocr_config
+        if config.ocr and ocr_config.cache_path:
+            self.ocr_cache = OcrCache(ocr_config.cache_path, ocr_config.cache_max_size)
+
     def get_number_of_pages(self, path) -> int:
         import pdfplumber
 
         with pdfplumber.open(path) as reader:
-            return len(reader.pages)
+            return _count_pages(reader.doc)
 
     @resilient
-    def parse(self, path: str) -> ParsedPDF:
+    def inspect(self, path: str, file: Optional[str] = None) -> InspectedPDF:
+        """
+        Reads the page count, the metadata and the outlines of the document. Only the
+        trailer, the cross reference table, the catalog and the page tree are read, no
+        page content is loaded or analyzed. The document is read from `file` if given, e.g. a
+        repaired copy of `path`.
+        """
         import pdfplumber
 
-        bboxes = []
-
-        with pdfplumber.open(path) as reader:
-            properties = {
-                k: v
-                for k, v
-                in reader.metadata.items()
-                if isinstance(v, str) or isinstance(v, int) or isinstance(v, float)
-            }
-
-            metrics = {}
-            for page in reader.pages:
-                if self.config.object_filter:
-                    page = page.filter(self.config.object_filter)
+        with pdfplumber.open(file or path) as reader:
+            properties = self.get_properties(reader, path, _count_pages(reader.doc))
+            return InspectedPDF(path, properties, outlines=_get_outlines(reader.doc))
 
-                metrics_collector = MetricsCollector(page)
-                page = page.filter(metrics_collector)
+    @resilient
+    def parse(
+        self,
+        path: str,
+        pages: Optional[Iterable[int]] = None,
+        max_pages: Optional[int] = None,
+        file: Optional[str] = None,
+    ) -> ParsedPDF:
+        """
+        Parses the document, optionally only the given one based page numbers and at
+        most `max_pages` pages. Skipped pages are neither analyzed nor measured. The
+        document is read from `file` if given, e.g. a repaired copy of `path`.
+        """
+        import pdfplumber
 
-                boxes = self.get_boxes(reader.doc, page, self.config)
-                bboxes.extend(boxes)
+        with pdfplumber.open(file or path) as reader, page_render_cache.releasing(reader):
+            num_pages = _count_pages(reader.doc)
+            properties = self.get_properties(reader, path, num_pages)
+            numbers = _select_pages(num_pages, pages, max_pages)
 
-                metrics[page.page_number - 1] = {
-                    "tags": metrics_collector.tags,
-                    "stroking_colors": metrics_collector.stroking_color,
-                    "overlapping_pixels": metrics_collector.overlapping_pixels
-                }
+            if self.config.parallel.workers > 1 and len(numbers) > self.config.parallel.pages_per_task:
+                bboxes, metrics = self._parse_pages_parallel(file or path, numbers)
+                self._attach_pages(reader, bboxes)
+            else:
+                bboxes, metrics = self.parse_pages(reader, [reader.pages[n - 1] for n in numbers])
 
-                if self.config.screenshot:
-                    self.take_screenshot(page, boxes)
+        return ParsedPDF(path, bboxes, properties=properties, metrics=metrics, file=file)
 
-            properties["num_pages"] = len(reader.pages)
+    def get_properties(self, reader, path: str, num_pages: int) -> dict:
+        properties = {
+            k: v
+            for k, v
+            in reader.metadata.items()
+            if isinstance(v, str) or isinstance(v, int) or isinstance(v, float)
+        }
+        properties["num_pages"] = num_pages
 
         if "size" not in properties:
             properties["size"] = os.stat(path).st_size
         if "name" not in properties:
             properties["name"] = path[path.rfind("/") + 1:]
 
-        return ParsedPDF(path, bboxes, properties=properties, metrics=metrics)
+        return properties
+
+    def parse_pages(self, reader, pages: List[Page]) -> Tuple[List[Box], Dict[int, dict]]:
+        bboxes = []
+        metrics = {}
+
+        collect_metrics = MetricsCollector(self.config.metrics)
+
+        def _complete(page: Page, pending: PendingResult):
+            boxes = pending.result()
+            bboxes.extend(boxes)
+
+            metrics[page.page_number - 1] = collect_metrics(page)
+
+            if self.config.screenshot:
+                self.take_screenshot(page, boxes)
+
+            page_render_cache.release(page)
+
+        ocr_executor = OcrExecutor(self.config.bbox_config.ocr_config) if self.config.ocr else None
+        with ocr_executor or nullcontext():
+            queue = deque()
+            for page in pages:
+                if self.config.object_filter:
+                    page = page.filter(self.config.object_filter)
+
+                queue.append((page, self.submit_boxes(reader.doc, page, self.config, ocr_executor)))
+
+                # pages are completed in order as soon as their ocr results are available
+                while queue and queue[0][1].done():
+                    _complete(*queue.popleft())
+
+            while queue:
+                _complete(*queue.popleft())
+
+        return bboxes, metrics
+
+    def _parse_pages_parallel(self, path: str, numbers: List[int]) -> Tuple[List[Box], Dict[int, dict]]:
+        from concurrent.futures import ProcessPoolExecutor
+
+        step = self.config.parallel.pages_per_task
+        chunks = [numbers[start:start + step] for start in range(0, len(numbers), step)]
+
+        # the tesseract processes of all workers share the cpus
+        workers = self.config.parallel.workers
+        config = self.config.model_copy(deep=True)
+        ocr_config = config.bbox_config.ocr_config
+        ocr_config.workers = max(1, (ocr_config.workers or os.cpu_count() or 1) // workers)
+
+        bboxes = []
+        metrics = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_parse_page_numbers, path, config, chunk)
+                for chunk in chunks
+            ]
+            # results are merged in submission, i.e. page, order
+            for future in futures:
+                chunk_bboxes, chunk_metrics = future.result()
+                bboxes.extend(chunk_bboxes)
+                metrics.update(chunk_metrics)
+
+        return bboxes, metrics
+
+    def _attach_pages(self, reader, bboxes: List[Box]):
+        for box in bboxes:
+            if isinstance(box, PageBoundBox):
+                box.attach(reader.pages[box.page_number - 1])
 
     @resilient
-    def parse_paged(self, path: str) -> Generator[ParsedPDFPage, None, None]:
+    def parse_paged(
+        self,
+        path: str,
+        pages: Optional[Iterable[int]] = None,
+        max_pages: Optional[int] = None,
+        resume_after: int = 0,
+        file: Optional[str] = None,
+    ) -> Generator[ParsedPDFPage, None, None]:
+        """
+        Parses the document page by page. Pages are created one at a time instead of
+        all at once via `reader.pages` and their layout is released before they are
+        yielded, so the memory usage does not grow with the number of pages. Selected
+        pages up to `resume_after` are skipped, e.g. to continue a parse which failed,
+        and the document is read from `file` if given.
+        """
         import pdfplumber
+        from pdfminer.pdfpage import PDFPage
+        from pdfplumber.page import Page
 
-        with pdfplumber.open(path) as reader:
-            properties = reader.metadata
-            for page in reader.pages:
-                boxes = self.get_boxes(reader.doc, page, self.config)
+        with pdfplumber.open(file or path) as reader, page_render_cache.releasing(reader):
+            num_pages = _count_pages(reader.doc)
+            properties = self.get_properties(reader, path, num_pages)
+            numbers = {n for n in _select_pages(num_pages, pages, max_pages) if n > resume_after}
+
+            doctop = 0
+            for idx, page_obj in enumerate(PDFPage.create_pages(reader.doc)):
+                if not numbers:
+                    break
+
+                page = Page(reader, page_obj, page_number=idx + 1, initial_doctop=doctop)
+                doctop += page.height
+                if page.page_number not in numbers:
+                    continue
+
+                numbers.remove(page.page_number)
+                bboxes, metrics = self.parse_pages(reader, [page])
 
-                if self.config.screenshot:
-                    self.take_screenshot(page, boxes)
+                page.close()
+                _release_objects(reader.doc)
 
-                yield ParsedPDFPage(path, boxes, properties=properties)
-                page.flush_cache()
-                # TODO: update pdfplumber where cache handling is improved by default
-                # https://github.com/jsvine/pdfplumber/issues/193
-                if hasattr(page.get_textmap, "cache_clear"):
-                    page.get_textmap.cache_clear()
+                yield ParsedPDFPage(
+                    path,
+                    bboxes,
+                    properties=properties,
+                    metrics=metrics,
+                    file=file,
+                    page_number=page.page_number,
+                )
 
     @staticmethod
     def parse_folder(
             path: str,
             config: PDFParserConfig = _DEFAULT_PARSER_CONFIG,
             file_filter: FileFilter = lambda _: True,
+            workers: int = 1,
+            timeout: Optional[float] = None,
+            pages: Optional[Iterable[int]] = None,
+            max_pages: Optional[int] = None,
     ) -> Iterator[ParsedPDF]:
+        """
+        Parses all pdf files of the given folder. With `workers > 1` the documents are
+        parsed in worker processes and yielded in order of completion, failed files and
+        files exceeding `timeout` seconds are logged and skipped. `pages` and
+        `max_pages` restrict the parsed pages of each document, see `parse`.
+        """
         parser = PDFParser(config)
-        for file in get_files(path, ".pdf"):
-            try:
-                if file_filter(file):
-                    yield parser.parse(file)
-            except DataRiotException as ex:
-                logging.warning(ex)
+        parse = partial(parser.parse, pages=None if pages is None else tuple(pages), max_pages=max_pages)
+        files = (file for file in get_files(path, ".pdf") if file_filter(file))
+
+        yield from parse_files(parse, files, workers, timeout)
+
+    @staticmethod
+    def inspect_folder(
+            path: str,
+            file_filter: FileFilter = lambda _: True,
+            workers: int = 1,
+            timeout: Optional[float] = None,
+    ) -> Iterator[InspectedPDF]:
+        """
+        Inspects all pdf files of the given folder, see `inspect`. With `workers > 1`
+        the documents are inspected in worker processes and yielded in order of
+        completion, failed files and files exceeding `timeout` seconds are logged
+        and skipped.
+        """
+        parser = PDFParser()
+        files = (file for file in get_files(path, ".pdf") if file_filter(file))
+
+        yield from parse_files(parser.inspect, files, workers, timeout, action="inspecting")
+
+
+def _parse_page_numbers(path: str, config: PDFParserConfig, numbers: List[int]) -> Tuple[List[Box], Dict[int, dict]]:
+    import pdfplumber
+
+    parser = PDFParser(config)
+    with pdfplumber.open(path) as reader, page_render_cache.releasing(reader):
+        return parser.parse_pages(reader, [reader.pages[n - 1] for n in numbers])
+
+
+def _select_pages(num_pages: int, pages: Optional[Iterable[int]], max_pages: Optional[int]) -> List[int]:
+    if pages is None:
+        numbers = list(range(1, num_pages + 1))
+    else:
+        numbers = sorted({n for n in pages if 1 <= n <= num_pages})
+
+    return numbers if max_pages is None else numbers[:max_pages]
+
+
+def _count_pages(doc) -> int:
+    # the page tree is walked like pdfplumber does for `reader.pages`, but without
+    # creating the pages, the /Count entry may be wrong for damaged files
+    from pdfminer.pdfpage import PDFPage
+
+    return sum(1 for _ in PDFPage.create_pages(doc))
+
+
+def _get_outlines(doc) -> List[Tuple[int, str]]:
+    from pdfminer.pdfdocument import PDFNoOutlines
+
+    try:
+        return [(level, title) for level, title, *_ in doc.get_outlines()]
+    except PDFNoOutlines:
+        return []
+    except Exception as ex:
+        # malformed outlines must not prevent reading the rest of the document
+        logging.warning(f"error while reading the outlines: {ex!r}")
+        return []
+
+
+def _release_objects(doc):
+    # pdfminer caches every resolved object of the document including the
+    # decoded data of content streams and images, which would accumulate over
+    # all pages of the document. The caches are private attributes of
+    # PDFDocument as of pdfminer.six 20231228 and are left alone if they change.
+    for cache in ("_cached_objs", "_parsed_objs"):
+        if hasattr(doc, cache):
+            getattr(doc, cache).clear()
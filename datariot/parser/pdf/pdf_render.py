@@ -0,0 +1,140 @@
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import count
+from typing import Dict, Tuple, Union
+
+from PIL import Image as PILImage
+from PIL.Image import Image
+from pdfplumber.display import DEFAULT_RESOLUTION, PageImage, get_page_image
+from pdfplumber.page import Page
+from pdfplumber.pdf import PDF
+
+
+class PageRenderCache:
+    """
+    Least recently used cache of full page renderings. Page images of cropped or
+    filtered pages are served by cropping the cached rendering of their root page
+    instead of letting pdfium interpret the page again for every region. Lower
+    resolutions of a page are downscaled from its highest cached resolution. The
+    cache is bounded by the total number of cached pixels and does not keep the
+    documents alive, their renderings are dropped when they are garbage collected
+    or released by `release_document`.
+    """
+
+    def __init__(self, max_pixels: int = 64_000_000):
+        self.max_pixels = max_pixels
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        # documents are identified by a counter instead of their id, which may be
+        # reused once they are garbage collected
+        self._documents: "weakref.WeakKeyDictionary[PDF, int]" = weakref.WeakKeyDictionary()
+        self._document_ids = count()
+        self._images: "OrderedDict[Tuple[int, int], Dict[float, Image]]" = OrderedDict()
+        self._pixels = 0
+
+    def to_image(
+        self, page: Page, resolution: Union[int, float] = DEFAULT_RESOLUTION
+    ) -> PageImage:
+        """Drop-in replacement for `page.to_image(resolution=resolution)`."""
+        return PageImage(page, original=self.render(page, resolution), resolution=resolution)
+
+    def render(
+        self, page: Page, resolution: Union[int, float] = DEFAULT_RESOLUTION
+    ) -> Image:
+        """Returns the rendering of the whole (root) page of the given page."""
+        with self._lock:
+            key = (self._get_document_id(page.pdf), page.page_number)
+            images = self._images.get(key, {})
+
+            if resolution in images:
+                self.hits += 1
+                self._images.move_to_end(key)
+                return images[resolution]
+
+            max_resolution = max(images, default=0)
+            if max_resolution > resolution:
+                self.hits += 1
+                image = _downscale(images[max_resolution], resolution / max_resolution)
+            else:
+                self.misses += 1
+                image = get_page_image(
+                    stream=page.pdf.stream,
+                    path=page.pdf.path,
+                    page_ix=page.page_number - 1,
+                    resolution=resolution,
+                    password=page.pdf.password,
+                )
+
+            self._put(key, resolution, image)
+            return image
+
+    def release(self, page: Page):
+        """Drops all cached renderings of the given page."""
+        with self._lock:
+            document_id = self._documents.get(page.pdf)
+            if document_id is not None:
+                self._evict((document_id, page.page_number))
+
+    def release_document(self, pdf: PDF):
+        """Drops all cached renderings of the pages of the given document."""
+        with self._lock:
+            document_id = self._documents.pop(pdf, None)
+            if document_id is not None:
+                self._release_document_id(document_id)
+
+    @contextmanager
+    def releasing(self, pdf: PDF):
+        """Context which releases the renderings of the given document on exit."""
+        try:
+            yield pdf
+        finally:
+            self.release_document(pdf)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._pixels = 0
+
+    def _get_document_id(self, pdf: PDF) -> int:
+        document_id = self._documents.get(pdf)
+        if document_id is None:
+            document_id = next(self._document_ids)
+            self._documents[pdf] = document_id
+            weakref.finalize(pdf, self._release_document_id, document_id)
+
+        return document_id
+
+    def _release_document_id(self, document_id: int):
+        with self._lock:
+            for key in [k for k in self._images if k[0] == document_id]:
+                self._evict(key)
+
+    def _put(self, key: Tuple[int, int], resolution: float, image: Image):
+        pixels = image.width * image.height
+        if pixels > self.max_pixels:
+            return
+
+        while self._pixels + pixels > self.max_pixels:
+            oldest = next((k for k in self._images if k != key), None)
+            if oldest is None:
+                return
+            self._evict(oldest)
+
+        self._images.setdefault(key, {})[resolution] = image
+        self._images.move_to_end(key)
+        self._pixels += pixels
+
+    def _evict(self, key: Tuple[int, int]):
+        for image in self._images.pop(key, {}).values():
+            self._pixels -= image.width * image.height
+
+
+def _downscale(image: Image, scale: float) -> Image:
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, PILImage.Resampling.LANCZOS)
+
+
+page_render_cache = PageRenderCache()
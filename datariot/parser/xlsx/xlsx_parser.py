@@ -1,9 +1,9 @@
-import logging
-from typing import Iterator
+from typing import Iterator, Optional
 
-from datariot.__spi__.error import DataRiotImportException, DataRiotException
+from datariot.__spi__.error import DataRiotImportException
 from datariot.__spi__.type import Parser, FileFilter, Parsed
 from datariot.__util__.io_util import get_files
+from datariot.__util__.parallel_util import parse_files
 from datariot.parser.xlsx.__spi__ import XlsxParserConfig, XlsxParsed
 from datariot.parser.xlsx.xlsx_model import XlsxRowBox
 
@@ -45,11 +45,13 @@ class XlsxParser(Parser):
         return XlsxParsed(path, bboxes)
 
     @staticmethod
-    def parse_folder(path: str, file_filter: FileFilter = lambda _: True) -> Iterator[Parsed]:
+    def parse_folder(
+        path: str,
+        file_filter: FileFilter = lambda _: True,
+        workers: int = 1,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Parsed]:
         parser = XlsxParser()
-        for file in get_files(path, ".xlsx"):
-            try:
-                if file_filter(file):
-                    yield parser.parse(file)
-            except DataRiotException as ex:
-                logging.warning(ex)
+        files = (file for file in get_files(path, ".xlsx") if file_filter(file))
+
+        yield from parse_files(parser.parse, files, workers, timeout)
@@ -1,7 +1,8 @@
-import pathlib
+import re
 from dataclasses import dataclass, field
 from io import BytesIO, StringIO
-from typing import List, Tuple, TypedDict, Dict, Any
+from itertools import groupby
+from typing import Iterator, List, Tuple, TypedDict, Dict, Any
 
 import requests
 
@@ -49,25 +50,14 @@ class HTMLTagSplitter(Splitter):
         Args:
             elements: HTML element content with associated identifying info and metadata
         """
-        aggregated_chunks: List[ElementType] = []
-
-        for element in elements:
-            if (
-                    aggregated_chunks
-                    and aggregated_chunks[-1]["metadata"] == element["metadata"]
-            ):
-                # If the last element in the aggregated list
-                # has the same metadata as the current element,
-                # append the current content to the last element's content
-                aggregated_chunks[-1]["content"] += "  \n" + element["content"]
-            else:
-                # Otherwise, append the current element to the aggregated list
-                aggregated_chunks.append(element)
+        chunks: List[Chunk] = []
+
+        # consecutive elements with common metadata are joined into one chunk
+        for metadata, group in groupby(elements, key=lambda e: e["metadata"]):
+            content = "  \n".join(element["content"] for element in group)
+            chunks.append(Chunk(text=content, data=metadata))
 
-        return [
-            Chunk(text=chunk["content"], data=chunk["metadata"])
-            for chunk in aggregated_chunks
-        ]
+        return chunks
 
     def split_text_from_url(self, url: str) -> List[Chunk]:
         """Split HTML from web URL
@@ -104,55 +94,114 @@ class HTMLTagSplitter(Splitter):
         parser = etree.HTMLParser(encoding="utf-8")
         tree = etree.parse(file, parser)
 
-        # document transformation for "structure-aware" chunking is handled with xsl.
-        # see comments in html_chunks_with_headers.xslt for more detailed information.
-        xslt_path = pathlib.Path(__file__).parent / "xsl/html_chunks_with_headers.xslt"
-        xslt_tree = etree.parse(xslt_path)
-        transform = etree.XSLT(xslt_tree)
-        result = transform(tree)
-        result_dom = etree.fromstring(str(result))
-
         # create filter and mapping for header metadata
         header_filter = [header[0] for header in self.tags_to_split_on]
         header_mapping = dict(self.tags_to_split_on)
 
-        # map xhtml namespace prefix
-        ns_map = {"h": "http://www.w3.org/1999/xhtml"}
-
-        # build list of elements from DOM
+        # build list of elements from the tags of interest with text
         elements = []
-        for element in result_dom.findall("*//*", ns_map):
-            if element.findall("*[@class='headers']") or element.findall(
-                    "*[@class='chunk']"
-            ):
-                elements.append(
-                    ElementType(
-                        url=file,
-                        xpath="".join(
-                            [
-                                node.text or ""
-                                for node in element.findall("*[@class='xpath']", ns_map)
-                            ]
-                        ),
-                        content="".join(
-                            [
-                                node.text or ""
-                                for node in element.findall("*[@class='chunk']", ns_map)
-                            ]
-                        ),
-                        metadata={
-                            # Add text of specified headers to metadata using header
-                            # mapping.
-                            header_mapping[node.tag]: node.text or ""
-                            for node in filter(
-                                lambda x: x.tag in header_filter,
-                                element.findall("*[@class='headers']/*", ns_map),
-                            )
-                        },
-                    )
-                )
+        for xpath, content, headers in _iter_chunks(tree.getroot()):
+            metadata = {}
+            if any(text for _, text in headers):
+                metadata = {
+                    # Add text of specified headers to metadata using header
+                    # mapping.
+                    header_mapping[tag]: text
+                    for tag, text in headers
+                    if tag in header_filter
+                }
+            elements.append(
+                ElementType(url=file, xpath=xpath, content=content, metadata=metadata)
+            )
 
         if not self.return_each_element:
             return self.aggregate_elements_to_chunks(elements)
         else:
             return [Chunk(chunk["content"], chunk["metadata"]) for chunk in elements]
+
+
+_CHUNK_TAGS = {"div", "p", "blockquote", "ol", "ul"}
+# tags whose text is not part of the text of the enclosing tag of interest
+_TEXT_EXCLUDED_TAGS = _CHUNK_TAGS | {"script", "style"}
+_HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_XML_WHITESPACE = re.compile(r"[ \t\r\n]+")
+
+Headers = Tuple[Tuple[str, str], ...]
+
+
+def _normalize_space(text: str) -> str:
+    return _XML_WHITESPACE.sub(" ", text).strip(" ")
+
+
+def _get_text(element) -> str:
+    """
+    Text of the element including the text of descendants, except for nested tags
+    of interest, which are chunks of their own, and non-content tags.
+    """
+    texts = []
+
+    def _collect(node):
+        if node.text:
+            texts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in _TEXT_EXCLUDED_TAGS:
+                _collect(child)
+            if child.tail:
+                texts.append(child.tail)
+
+    _collect(element)
+    return "".join(texts)
+
+
+def _get_heading(element) -> Tuple[str, str]:
+    return element.tag, _normalize_space("".join(element.itertext()))
+
+
+def _iter_chunks(root) -> Iterator[Tuple[str, str, Headers]]:
+    """
+    Yields the xpath, the normalized text and the headers of each tag of interest
+    with text in document order. The headers of an element are the nearest
+    preceding sibling headings of each ancestor and of the element itself, where
+    only headings of a higher level are looked up before a heading. A `header`
+    element contributes its child headings and ends the lookup.
+
+    The lookup is done in a single pass: for each sibling, the headings found when
+    starting the lookup at it are kept for every maximum heading level, so the
+    next sibling only has to extend them.
+    """
+    if root is None:
+        return
+
+    def _visit(parent, parent_xpath: str, parent_headers: Headers):
+        # headings of the lookup from the previous sibling by maximum level 0..6
+        previous: List[Headers] = [()] * 7
+        position = 0
+        for child in parent:
+            if not isinstance(child.tag, str):
+                continue
+
+            level = _HEADING_LEVELS.get(child.tag)
+            if level is not None:
+                heading = _get_heading(child)
+                current = [
+                    previous[level - 1] + (heading,) if max_level >= level else previous[max_level]
+                    for max_level in range(7)
+                ]
+            elif child.tag == "header":
+                headings = tuple(_get_heading(e) for e in child if e.tag in _HEADING_LEVELS)
+                current = [headings] * 7
+            else:
+                current = previous
+
+            position += 1
+            xpath = f"{parent_xpath}{child.tag}[{position}]/"
+            headers = parent_headers + current[6]
+            if child.tag in _CHUNK_TAGS:
+                text = _normalize_space(_get_text(child))
+                if text:
+                    yield xpath, text, headers
+
+            yield from _visit(child, xpath, headers)
+            previous = current
+
+    yield from _visit(root, f"{root.tag}[1]/", ())
@@ -9,3 +9,41 @@ def load_test_file(name: str):
 
 def get_test_path(name: str):
     return Path(__file__).parent.as_posix() + f"/{name}"
+
+
+def write_pdf(
+    path: str, page: bytes, resources: bytes, content: bytes, *objects: bytes, num_pages: int = 1
+):
+    """Writes a pdf of identical pages, additional objects are numbered from 5 on."""
+    from io import BytesIO
+
+    page_obj = (
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [" + page + b"] /Resources "
+        + resources + b" /Contents 4 0 R >>"
+    )
+    kids = [3] + [5 + len(objects) + i for i in range(num_pages - 1)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % e for e in kids), num_pages),
+        page_obj,
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        *objects,
+        *[page_obj] * (num_pages - 1),
+    ]
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1))
+    out.write(b"startxref\n%d\n%%%%EOF\n" % xref)
+
+    with open(path, "wb") as file:
+        file.write(out.getvalue())
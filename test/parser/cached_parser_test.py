@@ -0,0 +1,118 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from datariot.parser import CachedParser, ParseCache
+from datariot.parser.cached_parser import hash_config
+from datariot.parser.csv.__spi__ import CsvParserConfig
+from datariot.parser.csv.csv_parser import CsvParser
+
+
+class CachedParserTest(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        self.file = os.path.join(self.tmp_dir.name, "data.csv")
+        self._write("a,b\n1,2\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, content: str):
+        with open(self.file, "w") as file:
+            file.write(content)
+
+    def test_hit_and_miss(self):
+        cache = ParseCache(self.cache_dir)
+        parser = CachedParser(CsvParser(), cache)
+
+        first = parser.parse(self.file)
+        second = parser.parse(self.file)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual([b.row for b in first.bboxes], [b.row for b in second.bboxes])
+
+        self._write("a,b\n3,4\n")
+        changed = parser.parse(self.file)
+        self.assertEqual(changed.bboxes[1].row, ["3", "4"])
+        self.assertEqual(cache.misses, 2)
+
+        other_config = CachedParser(CsvParser(CsvParserConfig(skip_header=True)), cache)
+        self.assertEqual(len(other_config.parse(self.file).bboxes), 1)
+        self.assertEqual(cache.misses, 3)
+
+    def test_version_invalidation(self):
+        parser = CachedParser(CsvParser(), ParseCache(self.cache_dir, version="1"))
+        parser.parse(self.file)
+
+        cache = ParseCache(self.cache_dir, version="1")
+        CachedParser(CsvParser(), cache).parse(self.file)
+        self.assertEqual(cache.hits, 1)
+
+        cache = ParseCache(self.cache_dir, version="2")
+        CachedParser(CsvParser(), cache).parse(self.file)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_lru_eviction(self):
+        cache = ParseCache(self.cache_dir, max_size=250)
+        cache.put("a", "a" * 100)
+        cache.put("b", "b" * 100)
+        cache.get("a")
+        cache.put("c", "c" * 100)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_clear_keeps_foreign_files(self):
+        os.makedirs(self.cache_dir)
+        with open(os.path.join(self.cache_dir, "data.txt"), "w") as file:
+            file.write("user data")
+
+        cache = ParseCache(self.cache_dir, version="1")
+        cache.put("a", "a")
+        ParseCache(self.cache_dir, version="2")
+
+        self.assertEqual(["VERSION", "data.txt"], sorted(os.listdir(self.cache_dir)))
+
+    def test_hash_config_callables(self):
+        def _threshold(size):
+            return lambda o: o.get("size", 0) > size
+
+        self.assertNotEqual(hash_config(lambda o: o.get("size", 0) > 10), hash_config(lambda o: o.get("size", 0) > 12))
+        self.assertNotEqual(hash_config(_threshold(10)), hash_config(_threshold(12)))
+        self.assertEqual(hash_config(_threshold(10)), hash_config(_threshold(10)))
+
+        def _recursive():
+            def _f(o):
+                return _f(o)
+            return _f
+
+        self.assertEqual(hash_config(_recursive()), hash_config(_recursive()))
+
+    def test_size_of_shared_directory(self):
+        # two instances like the caches of two worker processes
+        first = ParseCache(self.cache_dir, max_size=250)
+        second = ParseCache(self.cache_dir, max_size=250)
+        first.put("a", "a" * 100)
+        second.put("b", "b" * 100)
+        os.utime(first._get_file("a"), (0, 0))
+        first.put("c", "c" * 100)
+
+        self.assertIsNone(second.get("a"))
+        self.assertIsNotNone(second.get("b"))
+        self.assertIsNotNone(second.get("c"))
+
+    def test_page_arguments(self):
+        from datariot.parser.pdf import PDFParser
+        from test.__asset__ import get_test_path
+
+        path = get_test_path("wikipedia_de.pdf")
+        cache = ParseCache(self.cache_dir)
+        parser = CachedParser(PDFParser(), cache)
+
+        first = parser.parse(path, pages=iter([2, 3]))
+        self.assertEqual([1, 2], sorted(first.metrics))
+        self.assertEqual([0], sorted(parser.parse(path, max_pages=1).metrics))
+        self.assertEqual([1, 2], sorted(parser.parse(path, pages=[2, 3]).metrics))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
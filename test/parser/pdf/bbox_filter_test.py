@@ -0,0 +1,71 @@
+import random
+from typing import List
+from unittest import TestCase
+
+from datariot.__spi__.type import Box
+from datariot.parser.pdf.bbox.bbox_filter import (
+    BoxIdentityBoundingBoxFilter,
+    BoxOverlapsBoundingBoxFilter,
+    NestedTableBoundingBoxFilter,
+)
+
+
+def _overlaps_reference(bboxes: List[Box]) -> List[Box]:
+    bboxes = list(reversed(sorted(bboxes, key=lambda b: (b.x2 - b.x1) * (b.y2 - b.y1))))
+    return [
+        b1 for i, b1 in enumerate(bboxes)
+        if not any(
+            b1.x2 >= b2.x1 and b2.x2 >= b1.x1 and b1.y2 >= b2.y1 and b2.y2 >= b1.y1
+            for j, b2 in enumerate(bboxes) if i != j
+        )
+    ]
+
+
+def _identity_reference(bboxes: List[Box]) -> List[Box]:
+    bboxes = sorted(bboxes, key=lambda x: x.size, reverse=True)
+    return [
+        b1 for i, b1 in enumerate(bboxes)
+        if not any(tuple(b1) == tuple(b2) for b2 in bboxes[i + 1:])
+    ]
+
+
+def _nested_reference(bboxes: List[Box]) -> List[Box]:
+    bboxes = sorted(bboxes, key=lambda x: x.size, reverse=True)
+    return [
+        b1 for i, b1 in enumerate(bboxes)
+        if not any(b1.is_contained_in(b2) for j, b2 in enumerate(bboxes) if i != j)
+    ]
+
+
+def _random_boxes(rnd: random.Random) -> List[Box]:
+    span = rnd.choice([50, 200, 800])
+    boxes = []
+    for _ in range(rnd.randint(0, 80)):
+        x, y = rnd.randint(-20, span), rnd.randint(-20, span)
+        w = rnd.choice([0, 1, rnd.randint(0, 60), rnd.randint(0, span)])
+        h = rnd.choice([0, 1, rnd.randint(0, 60), rnd.randint(0, span)])
+        boxes.append(Box(x, x + w, y, y + h))
+
+    # duplicates for the identity and nesting checks
+    for box in rnd.sample(boxes, min(len(boxes), 5)):
+        boxes.append(Box(box.x1, box.x2, box.y1, box.y2))
+
+    return boxes
+
+
+class BoundingBoxFilterTest(TestCase):
+
+    def test_filters_match_reference(self):
+        rnd = random.Random(42)
+        filters = [
+            (BoxOverlapsBoundingBoxFilter(), _overlaps_reference),
+            (BoxIdentityBoundingBoxFilter(), _identity_reference),
+            (NestedTableBoundingBoxFilter(), _nested_reference),
+        ]
+
+        for _ in range(300):
+            boxes = _random_boxes(rnd)
+            for box_filter, reference in filters:
+                expected = [id(b) for b in reference(boxes)]
+                actual = [id(b) for b in box_filter(None, boxes)]
+                self.assertEqual(expected, actual, type(box_filter).__name__)
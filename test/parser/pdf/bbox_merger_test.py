@@ -0,0 +1,122 @@
+import random
+from typing import List
+from unittest import TestCase
+
+from datariot.parser.__spi__ import DocumentFonts
+from datariot.parser.pdf.__spi__ import BBoxConfig
+from datariot.parser.pdf.bbox.bbox_merger import CoordinatesBoundingBoxMerger
+from datariot.parser.pdf.pdf_model import PDFTextBox
+
+
+def _merge_reference(config: BBoxConfig, bboxes: List[PDFTextBox]) -> List[PDFTextBox]:
+    # merges by concatenating the text of a new box per merged word
+    most_common_size = DocumentFonts.from_bboxes(bboxes).most_common_size
+
+    results = []
+    prev = bboxes[0].copy()
+    for bbox in bboxes[1:]:
+        is_same_line = abs(prev.y2 - bbox.y2) <= config.merge_same_line_tolerance
+        is_blank = bbox.text.strip() == ""
+        continue_link = bbox.last_hyperlink is not None and prev.last_hyperlink == bbox.last_hyperlink
+
+        font_rule = (
+            (config.merge_blank_always and is_blank)
+            or (config.merge_single_char_always and len(bbox.text.strip()) == 1)
+            or (
+                config.merge_same_line_always_after_most_common
+                and prev.text.strip() != ""
+                and prev.font_size == most_common_size
+                and is_same_line
+            )
+            or (
+                (not config.merge_same_font_size or prev.font_size == bbox.font_size)
+                and (not config.merge_same_font_name or prev.font_name == bbox.font_name)
+                and (not config.merge_same_font_weight or prev.font_weight == bbox.font_weight)
+            )
+        )
+        same_line_rule = is_same_line and prev.x2 < bbox.x1 and (bbox.x1 - prev.x2) < config.merge_x_tolerance
+        consecutive_line_rule = (
+            config.merge_blank_consecutive_lines or not is_blank
+        ) and (bbox.y1 - prev.y2) < config.merge_y_tolerance
+
+        if continue_link or (font_rule and (same_line_rule or consecutive_line_rule)):
+            prev_is_blank = prev.text.strip() == ""
+            separator = "" if continue_link else " " if is_same_line else "\n"
+            prev = prev.with_text(prev.text + separator + bbox.text)
+            if prev_is_blank:
+                prev.font_name = bbox.font_name
+                prev.font_size = bbox.font_size
+            prev.x1, prev.y1 = min(prev.x1, bbox.x1), min(prev.y1, bbox.y1)
+            prev.x2, prev.y2 = max(prev.x2, bbox.x2), max(prev.y2, bbox.y2)
+            prev.add_hyperlinks(bbox.hyperlinks)
+        else:
+            results.append(prev)
+            prev = bbox.copy()
+
+    results.append(prev)
+    return results
+
+
+def _random_words(rnd: random.Random) -> List[PDFTextBox]:
+    words = []
+    x, y = 0, 0
+    for _ in range(rnd.randint(1, 60)):
+        if rnd.random() < 0.2:
+            x, y = rnd.randint(0, 20), y + rnd.choice([1, 5, 12, 30])
+        width = rnd.randint(1, 30)
+        text = rnd.choice(["a", "bb", " ", "", "word", "  x ", "\n"])
+        font_size = rnd.choice([8, 10, 10.4, 12])
+        font_name = rnd.choice(["Arial", "Arial-Bold", "Times"])
+        word = PDFTextBox(x, y, x + width, y + rnd.choice([8, 10, 12]), text, font_size, font_name, 1)
+        if rnd.random() < 0.3:
+            word.set_hyperlink(rnd.choice(["https://a.de", "https://b.de"]))
+
+        words.append(word)
+        x += width + rnd.randint(-2, 15)
+
+    return words
+
+
+def _dense_page(num_words: int, words_per_line: int = 12) -> List[PDFTextBox]:
+    return [
+        PDFTextBox(10 + (i % words_per_line) * 40, 10 + (i // words_per_line) * 12,
+                   45 + (i % words_per_line) * 40, 20 + (i // words_per_line) * 12,
+                   "lorem", 10, "Arial", 1)
+        for i in range(num_words)
+    ]
+
+
+def _as_tuple(box: PDFTextBox):
+    links = [(h.start_idx, h.end_idx, h.uri) for h in box.hyperlinks]
+    return tuple(box), box.text, box.font_size, box.font_name, box.page_number, links
+
+
+class CoordinatesBoundingBoxMergerTest(TestCase):
+
+    def test_merger_matches_reference(self):
+        rnd = random.Random(42)
+        flags = [
+            "merge_same_font_size",
+            "merge_same_font_name",
+            "merge_same_font_weight",
+            "merge_blank_always",
+            "merge_single_char_always",
+            "merge_same_line_always_after_most_common",
+            "merge_blank_consecutive_lines",
+        ]
+
+        for i in range(500):
+            config = BBoxConfig(**{flag: rnd.random() < 0.5 for flag in flags})
+            expected = _merge_reference(config, _random_words(random.Random(i)))
+            actual = CoordinatesBoundingBoxMerger(config)(None, _random_words(random.Random(i)))
+
+            self.assertEqual([_as_tuple(b) for b in expected], [_as_tuple(b) for b in actual])
+
+    def test_dense_page(self):
+        config = BBoxConfig()
+
+        expected = _merge_reference(config, _dense_page(32_000))
+        actual = CoordinatesBoundingBoxMerger(config)(None, _dense_page(32_000))
+
+        # the words form a single paragraph, the reference copies it once per word
+        self.assertEqual([_as_tuple(b) for b in expected], [_as_tuple(b) for b in actual])
@@ -0,0 +1,96 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import pdfplumber
+
+from datariot.parser.pdf import PDFParser, PDFParserConfig
+from datariot.parser.pdf.bbox.bbox_merger import CoordinatesBoundingBoxMerger
+from datariot.parser.pdf.bbox.bbox_slicer import ColumnStyleBoundingBoxSlicer
+from datariot.parser.pdf.pdf_model import PDFColumnTextBox, PDFTextBox
+from test.__asset__ import get_test_path, write_pdf
+
+
+def _write_columns_pdf(path: str, num_columns: int, background: bytes = b""):
+    text = " ".join(
+        f"1 0 0 1 {50 + col * 128} {300 - row * 12} Tm (col{col} row{row} abcdefghi) Tj"
+        for col in range(num_columns)
+        for row in range(4)
+    )
+    write_pdf(
+        path,
+        b"0 0 600 400",
+        b"<< /Font << /F1 5 0 R >> >>",
+        background + b"0 g BT /F1 10 Tf " + text.encode() + b" ET",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>",
+    )
+
+
+class ColumnStyleBoundingBoxSlicerTest(TestCase):
+
+    def test_geometry_equals_raster_detection(self):
+        path = get_test_path("wikipedia_de.pdf")
+        config = PDFParserConfig()
+        config.bbox_config.columns_max = 3
+
+        geometry = PDFParser(config).parse(path).bboxes
+        config.bbox_config.columns_detection = "raster"
+        raster = PDFParser(config).parse(path).bboxes
+
+        self.assertTrue(any(isinstance(b, PDFColumnTextBox) for b in raster))
+        self.assertEqual([repr(b) for b in raster], [repr(b) for b in geometry])
+        self.assertEqual(
+            [(b.num_columns, b.column) for b in raster if isinstance(b, PDFColumnTextBox)],
+            [(b.num_columns, b.column) for b in geometry if isinstance(b, PDFColumnTextBox)],
+        )
+
+    def test_four_columns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "columns.pdf")
+            _write_columns_pdf(path, 4)
+            bboxes = PDFParser().parse(path).bboxes
+
+        self.assertEqual(
+            [(4, "left"), (4, "center"), (4, "center"), (4, "right")],
+            [(b.num_columns, b.column) for b in bboxes],
+        )
+        for col, box in enumerate(bboxes):
+            self.assertEqual(
+                "\n".join(f"col{col} row{row} abcdefghi" for row in range(4)),
+                box.text.strip(),
+            )
+
+    def test_reuse_page_words(self):
+        config = PDFParserConfig()
+        slicer = ColumnStyleBoundingBoxSlicer(config.bbox_config)
+        merger = CoordinatesBoundingBoxMerger(config.bbox_config)
+
+        with pdfplumber.open(get_test_path("wikipedia_de.pdf")) as pdf:
+            for page in pdf.pages[:8]:
+                words = page.extract_words(extra_attrs=["fontname", "size"], keep_blank_chars=True)
+                boxes = [PDFTextBox.from_dict({**w, "page_number": page.page_number}) for w in words]
+                boxes = merger(page, [b for b in boxes if b.text.strip()])
+
+                expected = slicer(page, boxes)
+                actual = slicer(page, boxes, words)
+                self.assertEqual([(tuple(b), b.text) for b in expected], [(tuple(b), b.text) for b in actual])
+
+    def test_columns_on_background_fill(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "columns.pdf")
+            _write_columns_pdf(path, 4, background=b"0.9 0.9 1 rg 0 0 600 400 re f ")
+            bboxes = PDFParser().parse(path).bboxes
+
+            config = PDFParserConfig()
+            config.bbox_config.columns_max = 2
+            geometry = PDFParser(config).parse(path).bboxes
+            config.bbox_config.columns_detection = "raster"
+            raster = PDFParser(config).parse(path).bboxes
+
+        # the page filling rect does not hide the gaps between the columns
+        self.assertEqual(
+            [(4, "left"), (4, "center"), (4, "center"), (4, "right")],
+            [(b.num_columns, b.column) for b in bboxes if isinstance(b, PDFColumnTextBox)],
+        )
+        self.assertEqual([repr(b) for b in raster], [repr(b) for b in geometry])
+        self.assertEqual(2, sum(isinstance(b, PDFColumnTextBox) for b in geometry))
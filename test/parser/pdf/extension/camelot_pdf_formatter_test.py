@@ -0,0 +1,159 @@
+import base64
+import json
+import os
+import random
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+
+from datariot.__util__.image_util import to_base64
+from datariot.__util__.text_util import create_uuid_from_string
+from datariot.parser.pdf import PDFParser, PDFParserConfig
+from datariot.parser.pdf.extension.camelot_pdf_formatter import (
+    CamelotPDFFormatter,
+    _find_tables,
+    _group_boxes,
+    _read_tables,
+)
+from datariot.parser.pdf.pdf_model import PDFImageBox, PDFLineCurveBox, PDFTextBox
+from test.__asset__ import get_test_path
+
+
+def _group_reference(bboxes):
+    # recursive depth first search over all remaining boxes
+    def _intersections(bbox, others):
+        return [
+            box for box in others
+            if bbox.page_number == box.page_number and bbox is not box
+            and bbox.x2 >= box.x1 and box.x2 >= bbox.x1 and bbox.y2 >= box.y1 and box.y2 >= bbox.y1
+        ]
+
+    def _collect(bbox, others):
+        if not any(bbox is box for box in others):
+            return []
+        others.remove(bbox)
+        group = [bbox]
+        for box in _intersections(bbox, others):
+            group.extend(_collect(box, others))
+        return group
+
+    remaining = list(bboxes)
+    groups = []
+    for idx, bbox in enumerate(bboxes):
+        if isinstance(bbox, (PDFImageBox, PDFLineCurveBox)) and any(bbox is box for box in remaining):
+            groups.append((idx, bbox, _collect(bbox, remaining)))
+    return groups
+
+
+def _random_page_boxes(rnd: random.Random):
+    boxes = []
+    for _ in range(rnd.randint(0, 60)):
+        page = SimpleNamespace(page_number=rnd.randint(1, 3))
+        x, y = rnd.randint(0, 300), rnd.randint(0, 300)
+        data = {"x0": x, "x1": x + rnd.randint(0, 40), "top": y, "bottom": y + rnd.randint(0, 40)}
+        kind = rnd.random()
+        if kind < 0.4:
+            boxes.append(PDFLineCurveBox(page, data))
+        elif kind < 0.6:
+            boxes.append(PDFImageBox(page, data))
+        else:
+            boxes.append(PDFTextBox(data["x0"], data["top"], data["x1"], data["bottom"], "text", 10, "Arial", page.page_number))
+    return boxes
+
+
+def _line_grid(num_grids: int, num_lines: int):
+    # ruling lines of separate grids on a single page, each grid is one group
+    page = SimpleNamespace(page_number=1)
+    boxes = []
+    for g in range(num_grids):
+        x, y = (g % 8) * 70, (g // 8) * 70
+        for i in range(num_lines):
+            boxes.append(PDFLineCurveBox(page, {"x0": x, "x1": x + 60, "top": y + i * 60 / num_lines, "bottom": y + i * 60 / num_lines}))
+            boxes.append(PDFLineCurveBox(page, {"x0": x + i * 60 / num_lines, "x1": x + i * 60 / num_lines, "top": y, "bottom": y + 60}))
+    return boxes
+
+
+def _write_image_pdf(path: str, num_pages: int):
+    # the same figure on every page
+    from PIL import Image, ImageDraw
+
+    pages = []
+    for _ in range(num_pages):
+        page = Image.new("RGB", (300, 400), "white")
+        ImageDraw.Draw(page).ellipse((50, 50, 250, 200), fill="red")
+        pages.append(page)
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+
+
+def _as_ids(groups):
+    return [(idx, id(origin), sorted(id(b) for b in group)) for idx, origin, group in groups]
+
+
+class CamelotPDFFormatterTest(TestCase):
+
+    def test_read_tables_once_per_page(self):
+        path = get_test_path("wikipedia_de.pdf")
+        areas = [(50, 800 - i * 150, 500, 660 - i * 150) for i in range(3)]
+
+        _, stream = _read_tables(path, 20, ["{},{},{},{}".format(*area) for area in areas])
+
+        for area in areas:
+            _, expected = _read_tables(path, 20, ["{},{},{},{}".format(*area)])
+            actual = _find_tables(area, stream)
+            self.assertEqual(
+                [t.df.values.tolist() for t in expected], [t.df.values.tolist() for t in actual]
+            )
+
+        self.assertEqual([], _find_tables((600, 800, 700, 700), stream))
+
+    def test_group_boxes_matches_reference(self):
+        rnd = random.Random(42)
+        for _ in range(300):
+            boxes = _random_page_boxes(rnd)
+            self.assertEqual(_as_ids(_group_reference(boxes)), _as_ids(_group_boxes(boxes)))
+
+    def test_group_line_boxes(self):
+        boxes = _line_grid(num_grids=40, num_lines=25)
+
+        expected = _group_reference(boxes)
+        actual = _group_boxes(boxes)
+
+        # 2000 line boxes in 40 grids
+        self.assertEqual(40, len(actual))
+        self.assertEqual(_as_ids(expected), _as_ids(actual))
+
+    def test_media_is_deduplicated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "figures.pdf")
+            _write_image_pdf(path, num_pages=3)
+            config = PDFParserConfig()
+            parsed = PDFParser(config).parse(path)
+            expected_id = create_uuid_from_string(parsed.bboxes[0].to_hash())
+            expected_content = to_base64(parsed.bboxes[0].get_image()).decode("utf-8")
+
+            formatter = CamelotPDFFormatter(parsed, config)
+
+            self.assertEqual(3, len(formatter.parsed_withtblsandimgs.bboxes))
+            self.assertEqual(1, len(formatter.media_list))
+            self.assertEqual(expected_id, formatter.media_list[0]["id"])
+            self.assertEqual(expected_content, formatter.media_list[0]["content"])
+            self.assertNotIn("path", formatter.media_list[0])
+            json.dumps(formatter.media_list)
+
+    def test_media_is_written_to_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "figures.pdf")
+            _write_image_pdf(path, num_pages=2)
+            config = PDFParserConfig()
+            config.bbox_config.table_box_config.media_path = os.path.join(tmp, "media")
+            parsed = PDFParser(config).parse(path)
+            expected_content = to_base64(parsed.bboxes[0].get_image()).decode("utf-8")
+
+            formatter = CamelotPDFFormatter(parsed, config)
+
+            entry = formatter.media_list[0]
+            self.assertEqual(1, len(formatter.media_list))
+            self.assertEqual(os.path.join(tmp, "media", entry["source"], entry["id"] + ".webp"), entry["path"])
+            self.assertNotIn("content", entry)
+            with open(entry["path"], "rb") as file:
+                self.assertEqual(expected_content, base64.b64encode(file.read()).decode("utf-8"))
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from unittest import TestCase
+
+from datariot.parser.pdf import PDFParser, PDFParserConfig
+from datariot.parser.pdf.filter.metrics_collector import MetricsCollector
+from test.__asset__ import get_test_path
+
+
+def _rect(x0, top, x1, bottom, **kwargs):
+    return {"x0": x0, "x1": x1, "y0": 100 - bottom, "y1": 100 - top, **kwargs}
+
+
+class MetricsCollectorTest(TestCase):
+
+    def test_overlapping_pixels(self):
+        page = SimpleNamespace(bbox=(0, 0, 100, 100), objects={
+            "char": [
+                _rect(0, 0, 10, 10, tag="P"),
+                # shares the last column with the previous char
+                _rect(9, 0, 20, 10, tag="P"),
+                _rect(10, 5, 30, 15, tag="P"),
+            ],
+            "rect": [
+                _rect(0, 0, 100, 100, stroking_color=(0,)),
+                # outside of the page
+                _rect(120, 0, 140, 10),
+            ],
+        })
+
+        metrics = MetricsCollector("full")(page)
+        self.assertEqual({"P": 3, "None": 2}, metrics["tags"])
+        self.assertEqual({"None": 4, (0,): 1}, metrics["stroking_colors"])
+        # the last char overlaps the 9 x 5 painted pixels of the second one and the
+        # page rect the 19 x 10 painted pixels of the first two chars
+        self.assertEqual(9 * 5 + 19 * 10, metrics["overlapping_pixels"])
+        self.assertNotIn("overlapping_coverage", metrics)
+
+        metrics = MetricsCollector("coverage")(page)
+        self.assertEqual({"P": 3, "None": 2}, metrics["tags"])
+        # every char pixel is covered twice, except for the 9 x 5 pixels shared by
+        # the last two chars which are covered three times
+        self.assertEqual((9 * 10 - 45) + (10 * 10 - 45) + 19 * 10 + 2 * 45, metrics["overlapping_coverage"])
+        self.assertNotIn("overlapping_pixels", metrics)
+
+        self.assertNotIn("overlapping_pixels", MetricsCollector("counts")(page))
+        self.assertEqual({}, MetricsCollector("off")(page))
+
+    def test_parse_without_metrics(self):
+        path = get_test_path("wikipedia_de.pdf")
+        parsed = PDFParser().parse(path, max_pages=3)
+        counted = PDFParser(PDFParserConfig(metrics="counts")).parse(path, max_pages=3)
+        skipped = PDFParser(PDFParserConfig(metrics="off")).parse(path, max_pages=3)
+
+        self.assertEqual([repr(b) for b in parsed.bboxes], [repr(b) for b in skipped.bboxes])
+        self.assertEqual({0: {}, 1: {}, 2: {}}, skipped.metrics)
+        self.assertEqual(
+            {k: {"tags": v["tags"], "stroking_colors": v["stroking_colors"]} for k, v in parsed.metrics.items()},
+            counted.metrics,
+        )
+
+    def test_overlapping_coverage_of_large_page(self):
+        page = SimpleNamespace(bbox=(0, 0, 14400, 14400), objects={
+            "rect": [
+                {"x0": 0, "x1": 7200, "y0": 0, "y1": 7200},
+                {"x0": 3600, "x1": 10800, "y0": 0, "y1": 7200},
+            ],
+        })
+
+        # measured on a downscaled raster
+        overlapping = MetricsCollector("coverage")(page)["overlapping_coverage"]
+        self.assertAlmostEqual(3600 * 7200, overlapping, delta=3600 * 7200 * 0.01)
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import zlib
+from unittest import TestCase
+
+import numpy as np
+from PIL import Image
+
+from datariot.parser.pdf import PDFParser, PDFParserConfig
+from datariot.parser.pdf.pdf_model import PDFImageBox
+from test.__asset__ import write_pdf
+
+
+def _write_image_pdf(
+    path: str,
+    image: Image.Image,
+    extra: str = "",
+    matrix: bytes = b"200 0 0 100 50 100",
+    page: bytes = b"",
+):
+    data = zlib.compress(image.tobytes())
+    colorspace = "DeviceRGB" if image.mode == "RGB" else "DeviceGray"
+    write_pdf(
+        path,
+        b"0 0 300 300",
+        b"<< /XObject << /Im0 5 0 R >> >>" + page,
+        b"q " + matrix + b" cm /Im0 Do Q",
+        f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+        f"/ColorSpace /{colorspace} /BitsPerComponent 8 /Filter /FlateDecode {extra}"
+        f"/Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream",
+    )
+
+
+class PDFImageTest(TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 255, (60, 120, 3), dtype=np.uint8)
+        self.image = Image.fromarray(pixels, "RGB")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _parse(self, strategy: str, extra: str = "", **kwargs) -> PDFImageBox:
+        path = os.path.join(self.tmp.name, "image.pdf")
+        _write_image_pdf(path, self.image, extra, **kwargs)
+
+        config = PDFParserConfig()
+        config.bbox_config.image_extraction = strategy
+        parsed = PDFParser(config).parse(path)
+
+        images = [b for b in parsed.bboxes if isinstance(b, PDFImageBox)]
+        self.assertEqual(1, len(images))
+        return images[0]
+
+    def test_embedded_image(self):
+        box = self._parse("embedded")
+
+        self.assertIsNotNone(box.embedded)
+        # the bbox of the image, not the one enlarged by the merge tolerances
+        self.assertEqual((50, 100, 250, 200), tuple(box))
+        self.assertEqual(self.image.tobytes(), box.get_file()[1].tobytes())
+        self.assertEqual((120 / 200, 60 / 100), box.image_ratio)
+        self.assertIs(box.get_image(), box.get_image())
+
+        box.release()
+        self.assertEqual(self.image.tobytes(), box.get_image().tobytes())
+        self.assertEqual((120 / 200, 60 / 100), box.image_ratio)
+
+    def test_embedded_image_ratio(self):
+        box = self._parse("embedded", matrix=b"240 0 0 30 50 100")
+
+        self.assertEqual(self.image.size, box.get_image().size)
+        self.assertEqual((120 / 240, 60 / 30), box.image_ratio)
+
+    def test_embedded_image_transformed(self):
+        # decoded pixels of flipped or rotated images do not match their rendering
+        for kwargs in [
+            {"matrix": b"200 0 0 -100 50 200"},
+            {"matrix": b"0 100 -200 0 250 100"},
+            {"page": b" /Rotate 90"},
+        ]:
+            with self.subTest(**kwargs):
+                box = self._parse("embedded", **kwargs)
+
+                self.assertIsNone(box.embedded)
+                self.assertNotEqual(self.image.size, box.get_image().size)
+
+    def test_rendered_image(self):
+        box = self._parse("render")
+
+        self.assertIsNone(box.embedded)
+        self.assertNotEqual(self.image.size, box.get_image().size)
+        # rendered images are not kept by the box
+        self.assertIsNot(box.get_image(), box.get_image())
+
+    def test_embedded_image_fallback(self):
+        # decode arrays cannot be applied to the raw samples, render instead
+        box = self._parse("embedded", "/Decode [1 0 1 0 1 0] ")
+
+        self.assertIsNotNone(box.embedded)
+        self.assertNotEqual(self.image.size, box.get_image().size)
@@ -0,0 +1,76 @@
+import os
+import pickle
+import tempfile
+import tracemalloc
+import zlib
+from unittest import TestCase
+
+from datariot.parser.pdf import PDFParser
+from datariot.parser.pdf.pdf_formatter import JSONPDFFormatter
+from datariot.parser.pdf.pdf_model import PDFColumnTextBox, PDFImageBox, PDFTextBox
+from test.__asset__ import write_pdf
+
+
+class _UnslottedTextBox(PDFTextBox):
+    # subclasses without __slots__ get a per instance __dict__ again
+    pass
+
+
+def _create_boxes(num: int, box_type: type = PDFTextBox):
+    return [box_type(i, 1.5, i + 10, 12.5, "word", 10.2, "Arial", 1) for i in range(num)]
+
+
+def _allocated_per_box(box_type: type) -> float:
+    _create_boxes(10, box_type)
+
+    tracemalloc.start()
+    boxes = _create_boxes(10_000, box_type)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return allocated / len(boxes)
+
+
+class PDFModelTest(TestCase):
+
+    def test_text_box_allocation(self):
+        self.assertFalse(hasattr(_create_boxes(1)[0], "__dict__"))
+        self.assertTrue(hasattr(_create_boxes(1, _UnslottedTextBox)[0], "__dict__"))
+
+        # the sizes depend on the python version, only the relation is stable
+        self.assertLess(_allocated_per_box(PDFTextBox), _allocated_per_box(_UnslottedTextBox))
+
+    def test_pickle_slotted_boxes(self):
+        box = PDFColumnTextBox(1.2, 2.5, 30.1, 12, "text", 9.6, "Arial-Bold", 3, 2, "right")
+        restored = pickle.loads(pickle.dumps(box))
+
+        self.assertEqual(box.__getstate__(), restored.__getstate__())
+        self.assertEqual((1, 2, 31, 12), tuple(restored))
+        self.assertEqual(("right", 10, "bold"), (restored.column, restored.font_size, restored.font_weight))
+
+        data = JSONPDFFormatter()(box)
+        self.assertEqual(("PDFColumnTextBox", "text"), (data["type"], data["_text"]))
+        self.assertEqual([{"start_idx": 0, "end_idx": 4, "uri": None}], data["hyperlinks"])
+
+    def test_close_unpickled_pages(self):
+        data = zlib.compress(bytes(200 * 200))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "image.pdf")
+            write_pdf(
+                path,
+                b"0 0 300 300",
+                b"<< /XObject << /Im0 5 0 R >> >>",
+                b"q 200 0 0 200 50 50 cm /Im0 Do Q",
+                b"<< /Type /XObject /Subtype /Image /Width 200 /Height 200 /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % len(data)
+                + data + b"\nendstream",
+            )
+
+            with pickle.loads(pickle.dumps(PDFParser().parse(path))) as parsed:
+                box = next(b for b in parsed.bboxes if isinstance(b, PDFImageBox))
+                self.assertEqual(1, box.page.page_number)
+                stream = parsed._pages._reader.stream
+                self.assertFalse(stream.closed)
+
+            self.assertTrue(stream.closed)
+            self.assertNotIn("_pages", parsed.__getstate__())
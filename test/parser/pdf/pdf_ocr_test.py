@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from datariot.parser.pdf import OcrConfig, ParallelConfig, PDFParser, PDFParserConfig
+from datariot.parser.pdf.pdf_model import PDFImageBox
+from datariot.parser.pdf.pdf_ocr import run_tesseract
+from test.__asset__ import write_pdf
+
+
+def _write_scan_pdf(path: str, num_pages: int, content: bytes = b"q 300 0 0 300 0 0 cm /Im0 Do Q"):
+    data = zlib.compress(bytes(range(256)) * 300)
+    write_pdf(
+        path,
+        b"0 0 300 300",
+        b"<< /XObject << /Im0 5 0 R >> >>",
+        content,
+        b"<< /Type /XObject /Subtype /Image /Width 240 /Height 320 /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % len(data)
+        + data + b"\nendstream",
+        num_pages=num_pages,
+    )
+
+
+class PDFOcrTest(TestCase):
+
+    def test_pooled_ocr(self):
+        num_pages = 6
+        lock = threading.Lock()
+        calls = []
+        running = [0, 0]
+
+        def run_tesseract(image, config):
+            with lock:
+                num = len(calls)
+                calls.append(num)
+                running[0] += 1
+                running[1] = max(running)
+
+            # the ocr of later pages finishes first
+            time.sleep((num_pages - num) * 0.02)
+            with lock:
+                running[0] -= 1
+            return f"text of call {num}"
+
+        config = PDFParserConfig(ocr=True)
+        config.bbox_config.ocr_config.workers = 3
+
+        with tempfile.TemporaryDirectory() as tmp, patch(
+            "datariot.parser.pdf.pdf_ocr.run_tesseract", run_tesseract
+        ):
+            path = os.path.join(tmp, "scan.pdf")
+            _write_scan_pdf(path, num_pages)
+            parsed = PDFParser(config).parse(path)
+
+        texts = [b for b in parsed.bboxes if not isinstance(b, PDFImageBox)]
+        images = [b for b in parsed.bboxes if isinstance(b, PDFImageBox)]
+
+        self.assertEqual(num_pages, len(images))
+        self.assertEqual(
+            [(i + 1, f"text of call {i}") for i in range(num_pages)],
+            [(b.page_number, b.text) for b in texts],
+        )
+        self.assertGreater(running[1], 1)
+        self.assertLessEqual(running[1], 3)
+
+    def test_ocr_cache(self):
+        calls = []
+
+        def run_tesseract(image, config):
+            calls.append(config.strategy)
+            return "cached text"
+
+        with tempfile.TemporaryDirectory() as tmp, patch(
+            "datariot.parser.pdf.pdf_ocr.run_tesseract", run_tesseract
+        ):
+            path = os.path.join(tmp, "scan.pdf")
+            _write_scan_pdf(path, 3)
+
+            config = PDFParserConfig(ocr=True)
+            config.bbox_config.ocr_config.cache_path = os.path.join(tmp, "cache")
+            PDFParser(config).parse(path)
+            num_calls = len(calls)
+
+            parser = PDFParser(config)
+            parsed = parser.parse(path)
+
+            self.assertEqual(num_calls, len(calls))
+            self.assertEqual((3, 0), (parser.ocr_cache.hits, parser.ocr_cache.misses))
+            self.assertEqual(3, sum(getattr(b, "text", None) == "cached text" for b in parsed.bboxes))
+
+            # a different tesseract configuration is a different entry
+            config.bbox_config.ocr_config.tesseract_config = "--psm 6"
+            PDFParser(config).parse(path)
+            self.assertGreater(len(calls), num_calls)
+
+    def test_only_scanned_pages(self):
+        calls = []
+
+        def run_tesseract(image, config):
+            calls.append(image.size)
+            return "scanned text"
+
+        config = PDFParserConfig(ocr=True)
+        config.bbox_config.ocr_config.only_scanned_pages = True
+
+        with tempfile.TemporaryDirectory() as tmp, patch(
+            "datariot.parser.pdf.pdf_ocr.run_tesseract", run_tesseract
+        ):
+            path = os.path.join(tmp, "scan.pdf")
+            _write_scan_pdf(path, 1)
+            PDFParser(config).parse(path)
+            self.assertEqual(1, len(calls))
+
+            # an image covering a third of the page is no scan
+            config.bbox_config.ocr_config.scan_min_image_coverage = 0.9
+            _write_scan_pdf(path, 1, b"q 300 0 0 100 0 0 cm /Im0 Do Q")
+            PDFParser(config).parse(path)
+            self.assertEqual(1, len(calls))
+
+            config.bbox_config.ocr_config.only_scanned_pages = False
+            PDFParser(config).parse(path)
+            self.assertEqual(2, len(calls))
+
+    def test_ocr_workers_of_parallel_parse(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        ocr_workers = []
+
+        def _parse_page_numbers(path, config, numbers):
+            ocr_workers.append(config.bbox_config.ocr_config.workers)
+            return [], {}
+
+        config = PDFParserConfig(ocr=True, parallel=ParallelConfig(workers=4, pages_per_task=2))
+        config.bbox_config.ocr_config.workers = 8
+
+        with tempfile.TemporaryDirectory() as tmp, patch(
+            "concurrent.futures.ProcessPoolExecutor", ThreadPoolExecutor
+        ), patch("datariot.parser.pdf.pdf_parser._parse_page_numbers", _parse_page_numbers):
+            path = os.path.join(tmp, "scan.pdf")
+            _write_scan_pdf(path, 6)
+            PDFParser(config).parse(path)
+
+        # the cpus of the ocr pool are split between the worker processes
+        self.assertEqual([2, 2, 2], ocr_workers)
+        self.assertEqual(8, config.bbox_config.ocr_config.workers)
+
+    @skipUnless(shutil.which("tesseract"), "tesseract is not installed")
+    def test_run_tesseract(self):
+        from PIL import Image, ImageDraw, ImageFont
+
+        image = Image.new("RGB", (800, 200), "white")
+        ImageDraw.Draw(image).text((40, 60), "Hello World", fill="black", font=ImageFont.load_default(size=64))
+
+        text = run_tesseract(image, OcrConfig(languages=["eng"], strategy="text"))
+        self.assertIn("Hello World", text)
+
+        data = run_tesseract(image, OcrConfig(languages=["eng"], strategy="data"))
+        self.assertEqual(["Hello", "World"], [e for e in data["text"] if e.strip()])
+        self.assertEqual(len(data["text"]), len(data["left"]))
@@ -1,7 +1,81 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from types import SimpleNamespace
 from unittest import TestCase
+from unittest.mock import patch
 
+from pdfminer.pdfparser import PDFSyntaxError
+
+from datariot.parser.pdf import ParallelConfig, PDFParser, PDFParserConfig
+from datariot.parser.pdf.pdf_parser import _get_outlines
+from test.__asset__ import get_test_path, write_pdf
+
+_PEAK_RSS_SCRIPT = """
+import resource, sys
 from datariot.parser.pdf import PDFParser
-from test.__asset__ import get_test_path
+
+for page in PDFParser().parse_paged(sys.argv[1]):
+    pass
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def _write_text_pdf(path: str, num_pages: int):
+    text = " ".join(
+        f"1 0 0 1 40 {780 - row * 12} Tm (line {row} lorem ipsum dolor sit amet) Tj"
+        for row in range(8)
+    )
+    write_pdf(
+        path,
+        b"0 0 595 842",
+        b"<< /Font << /F1 5 0 R >> >>",
+        b"BT /F1 10 Tf " + text.encode() + b" ET",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>",
+        num_pages=num_pages,
+    )
+
+
+def _get_peak_rss(path: str) -> int:
+    """Peak resident memory in KiB of a process streaming the pages of the pdf"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, path],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": root},
+    )
+    return int(result.stdout.strip())
+
+
+class _FailingParser(PDFParser):
+    """Fails once at the given page like a document with a broken page"""
+
+    def __init__(self, fail_at: int, config: PDFParserConfig = PDFParserConfig()):
+        super().__init__(config)
+        self.fail_at = fail_at
+        self.parsed_pages = []
+
+    def parse_pages(self, reader, pages):
+        for page in pages:
+            if page.page_number == self.fail_at:
+                self.fail_at = None
+                raise PDFSyntaxError("broken page")
+            self.parsed_pages.append(page.page_number)
+        return super().parse_pages(reader, pages)
+
+
+def _copy_repair(path, outfile):
+    shutil.copy(path, outfile)
+
+
+def _broken_repair(path, outfile):
+    with open(outfile, "wb") as file:
+        file.write(b"%PDF-1.4")
+    raise PDFSyntaxError("unrepairable")
 
 
 class PDFParserTest(TestCase):
@@ -12,3 +86,162 @@ class PDFParserTest(TestCase):
 
         assert parsed.properties["size"] is not None
         assert parsed.properties["name"] is not None
+
+    def test_parallel_parse(self):
+        parsed = PDFParser().parse(get_test_path("wikipedia_de.pdf"))
+
+        config = PDFParserConfig(parallel=ParallelConfig(workers=2, pages_per_task=20))
+        parallel = PDFParser(config).parse(get_test_path("wikipedia_de.pdf"))
+
+        self.assertEqual([tuple(b) for b in parsed.bboxes], [tuple(b) for b in parallel.bboxes])
+        self.assertEqual([repr(b) for b in parsed.bboxes], [repr(b) for b in parallel.bboxes])
+        self.assertEqual(parsed.metrics, parallel.metrics)
+        self.assertEqual(parsed.properties, parallel.properties)
+
+    def test_parse_paged(self):
+        path = get_test_path("wikipedia_de.pdf")
+        config = PDFParserConfig(object_filter=lambda o: o.get("size", 10) > 8)
+
+        parsed = PDFParser(config).parse(path)
+        pages = list(PDFParser(config).parse_paged(path))
+
+        self.assertEqual(parsed.properties["num_pages"], len(pages))
+        self.assertEqual(list(range(1, len(pages) + 1)), [p.page_number for p in pages])
+        self.assertEqual(
+            [(tuple(b), repr(b)) for b in parsed.bboxes],
+            [(tuple(b), repr(b)) for p in pages for b in p.bboxes],
+        )
+        self.assertEqual(parsed.metrics, {k: v for p in pages for k, v in p.metrics.items()})
+        self.assertTrue(all(p.properties == parsed.properties for p in pages))
+
+    def test_parse_paged_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            small = os.path.join(tmp, "small.pdf")
+            large = os.path.join(tmp, "large.pdf")
+            _write_text_pdf(small, 40)
+            _write_text_pdf(large, 400)
+
+            growth = _get_peak_rss(large) - _get_peak_rss(small)
+
+        # holding the layout of all pages would take about 200 MiB
+        self.assertLess(growth, 32 * 1024)
+
+    def test_parse_pages(self):
+        path = get_test_path("wikipedia_de.pdf")
+        parsed = PDFParser().parse(path)
+
+        def _boxes(bboxes, numbers):
+            return [(tuple(b), repr(b)) for b in bboxes if b.page_number in numbers]
+
+        selected = PDFParser().parse(path, pages=[7, 2, 2, 500])
+        self.assertEqual(_boxes(parsed.bboxes, {2, 7}), _boxes(selected.bboxes, {2, 7}))
+        self.assertEqual([1, 6], sorted(selected.metrics))
+        self.assertEqual(parsed.properties, selected.properties)
+
+        first = PDFParser().parse(path, pages=range(3, 80), max_pages=2)
+        self.assertEqual({3, 4}, {b.page_number for b in first.bboxes})
+
+        paged = list(PDFParser().parse_paged(path, max_pages=3))
+        self.assertEqual([1, 2, 3], [p.page_number for p in paged])
+        self.assertEqual(_boxes(parsed.bboxes, {1, 2, 3}), _boxes([b for p in paged for b in p.bboxes], {1, 2, 3}))
+
+    def test_inspect(self):
+        path = get_test_path("wikipedia_de.pdf")
+        parsed = PDFParser().parse(path, max_pages=1)
+
+        inspected = PDFParser().inspect(path)
+        self.assertEqual(80, inspected.num_pages)
+        self.assertEqual(parsed.properties, inspected.properties)
+        self.assertEqual([], inspected.outlines)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(path, os.path.join(tmp, "a.pdf"))
+            _write_text_pdf(os.path.join(tmp, "b.pdf"), 3)
+            with open(os.path.join(tmp, "c.pdf"), "wb") as file:
+                file.write(b"no pdf")
+
+            results = list(PDFParser.inspect_folder(tmp, workers=2))
+
+        self.assertEqual([("a.pdf", 80), ("b.pdf", 3)], sorted((r.properties["name"], r.num_pages) for r in results))
+
+    def test_resilient_parse_paged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "broken.pdf")
+            _write_text_pdf(path, 5)
+            config = PDFParserConfig(repair_cache_path=os.path.join(tmp, "repaired"))
+
+            with patch("pdfplumber.repair", side_effect=_copy_repair) as repair:
+                parser = _FailingParser(fail_at=3, config=config)
+                pages = list(parser.parse_paged(path))
+
+                self.assertEqual([1, 2, 3, 4, 5], [p.page_number for p in pages])
+                # pages before the failure are not parsed again
+                self.assertEqual([1, 2, 3, 4, 5], parser.parsed_pages)
+                # the results keep the original path and properties
+                self.assertEqual({path}, {p.path for p in pages})
+                self.assertTrue(all(p.properties == pages[0].properties for p in pages))
+                self.assertEqual("broken.pdf", pages[0].properties["name"])
+                self.assertEqual([None, None, *[pages[2].file] * 3], [p.file for p in pages])
+                self.assertTrue(os.path.isfile(pages[2].file))
+
+                parser = _FailingParser(fail_at=1, config=config)
+                parsed = parser.parse(path)
+                self.assertEqual(5, len(parsed.metrics))
+                self.assertEqual((path, pages[2].file), (parsed.path, parsed.file))
+
+                # repaired temp files are gone after the call
+                parser = _FailingParser(fail_at=1, config=PDFParserConfig())
+                parsed = parser.parse(path)
+                self.assertEqual((path, None), (parsed.path, parsed.file))
+
+                # selected pages and positional arguments are passed again after the repair
+                parser = _FailingParser(fail_at=3, config=config)
+                pages = list(parser.parse_paged(path, iter([2, 3, 4])))
+                self.assertEqual([2, 3, 4], [p.page_number for p in pages])
+
+                parser = _FailingParser(fail_at=3, config=config)
+                pages = list(parser.parse_paged(path, None, None, 1))
+                self.assertEqual([2, 3, 4, 5], [p.page_number for p in pages])
+
+                parser = _FailingParser(fail_at=3, config=config)
+                self.assertEqual([0, 2], sorted(parser.parse(path, pages=iter([1, 3])).metrics))
+
+            # the cached copy is reused, only the parse without a cache repairs again
+            self.assertEqual(2, repair.call_count)
+            self.assertEqual(1, len(os.listdir(os.path.join(tmp, "repaired"))))
+
+            # a failed repair leaves no temp file in the cache
+            _write_text_pdf(path, 4)
+            with patch("pdfplumber.repair", side_effect=_broken_repair):
+                with self.assertRaises(PDFSyntaxError):
+                    list(_FailingParser(fail_at=1, config=config).parse_paged(path))
+            self.assertEqual(1, len(os.listdir(os.path.join(tmp, "repaired"))))
+
+    def test_parse_paged_wrong_page_count(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "damaged.pdf")
+            _write_text_pdf(path, 3)
+            with open(path, "rb") as file:
+                data = file.read().replace(b"/Count 3", b"/Count 1")
+            with open(path, "wb") as file:
+                file.write(data)
+
+            parsed = PDFParser().parse(path)
+            pages = list(PDFParser().parse_paged(path))
+            inspected = PDFParser().inspect(path)
+            num_pages = PDFParser().get_number_of_pages(path)
+
+        self.assertEqual(3, parsed.properties["num_pages"])
+        self.assertEqual(3, inspected.num_pages)
+        self.assertEqual(3, num_pages)
+        self.assertEqual([1, 2, 3], [p.page_number for p in pages])
+        self.assertTrue(all(p.properties == parsed.properties for p in pages))
+
+    def test_malformed_outlines(self):
+        def _outlines():
+            yield 1, "Intro", None, None, None
+            raise KeyError("Title")
+
+        doc = SimpleNamespace(get_outlines=_outlines)
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual([], _get_outlines(doc))
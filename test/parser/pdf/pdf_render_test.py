@@ -0,0 +1,83 @@
+import gc
+import weakref
+from unittest import TestCase
+
+import numpy as np
+import pdfplumber
+
+from datariot.parser.pdf.pdf_render import PageRenderCache
+from test.__asset__ import get_test_path
+
+
+class PageRenderCacheTest(TestCase):
+
+    def setUp(self):
+        self.pdf = pdfplumber.open(get_test_path("wikipedia_de.pdf"))
+
+    def tearDown(self):
+        self.pdf.close()
+
+    def test_crops_equal_rendered_crops(self):
+        cache = PageRenderCache()
+        page = self.pdf.pages[3]
+
+        for bbox in [(50, 60, 200, 90), (-5, -5, 50, 50), (100, 100, 104, 400)]:
+            crop = page.crop(bbox, strict=False)
+            expected = np.asarray(crop.to_image(resolution=144).original)
+            actual = np.asarray(cache.to_image(crop, resolution=144).original)
+            self.assertTrue(np.array_equal(expected, actual))
+
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(2, cache.hits)
+
+    def test_pixel_bound(self):
+        cache = PageRenderCache()
+        image = cache.render(self.pdf.pages[0])
+        cache.max_pixels = 2 * image.width * image.height
+
+        for page in self.pdf.pages[:3]:
+            cache.render(page)
+        self.assertEqual(2, len(cache._images))
+
+        # the first page was evicted
+        cache.render(self.pdf.pages[0])
+        self.assertEqual(4, cache.misses)
+
+        cache.release(self.pdf.pages[0])
+        self.assertEqual(1, len(cache._images))
+
+    def test_downscale_highest_resolution(self):
+        cache = PageRenderCache()
+        page = self.pdf.pages[0]
+
+        image = cache.render(page, resolution=144)
+        expected = page.to_image(resolution=72).original
+        actual = cache.render(page, resolution=72)
+
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(expected.size, actual.size)
+        self.assertIs(actual, cache.render(page, resolution=72))
+        self.assertIs(image, cache.render(page, resolution=144))
+
+    def test_release_document(self):
+        cache = PageRenderCache()
+        pdf = pdfplumber.open(get_test_path("wikipedia_de.pdf"))
+        with cache.releasing(pdf):
+            cache.render(pdf.pages[0])
+            cache.render(self.pdf.pages[0])
+            self.assertEqual(2, len(cache._images))
+        pdf.close()
+
+        self.assertEqual(1, len(cache._images))
+
+        # the cache does not keep the document alive
+        pdf = pdfplumber.open(get_test_path("wikipedia_de.pdf"))
+        cache.render(pdf.pages[0])
+        ref = weakref.ref(pdf)
+        pdf.close()
+        del pdf
+        gc.collect()
+
+        self.assertIsNone(ref())
+        self.assertEqual(1, len(cache._images))
@@ -34,3 +34,12 @@ class HtmlTagSplitterTest(TestCase):
     def test_split(self):
         splitter = HTMLTagSplitter()
         self.assertEqual(len(splitter(html_string)), 8)
+
+    def test_split_large_document(self):
+        sections = "".join(f"<h2>Section {i}</h2><p>Text {i}</p>" for i in range(5000))
+        splitter = HTMLTagSplitter(tags_to_split_on=[("h1", "Header 1"), ("h2", "Header 2")])
+        chunks = splitter(f"<html><body><h1>Title</h1>{sections}</body></html>")
+
+        self.assertEqual(len(chunks), 5000)
+        self.assertEqual(chunks[-1].text, "Text 4999")
+        self.assertEqual(chunks[-1].data, {"Header 1": "Title", "Header 2": "Section 4999"})
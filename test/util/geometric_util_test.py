@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import numpy as np
+
+from datariot.__util__.geometric_util import (
+    calculate_bounding_boxes,
+    get_union_area,
+    paint_rectangles,
+)
+
+
+class GeometricUtilTest(TestCase):
+
+    def test_paint_rectangles(self):
+        rng = np.random.default_rng(0)
+        rects = rng.integers(-10, 110, size=(50, 4))
+        rects[:, 2:] = rects[:, :2] + rng.integers(0, 30, size=(50, 2))
+
+        expected = np.zeros((100, 120), dtype=np.uint8)
+        for x1, y1, x2, y2 in rects:
+            expected[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = 1
+
+        mask = np.zeros((100, 120), dtype=np.uint8)
+        paint_rectangles(mask, rects)
+
+        np.testing.assert_array_equal(expected, mask)
+
+    def test_get_union_area(self):
+        rng = np.random.default_rng(0)
+        rects = rng.integers(0, 100, size=(50, 4))
+        rects[:, 2:] = rects[:, :2] + rng.integers(-5, 30, size=(50, 2))
+
+        mask = np.zeros((130, 130), dtype=np.uint8)
+        paint_rectangles(mask, rects)
+
+        self.assertEqual(mask.sum(), get_union_area(rects))
+        self.assertAlmostEqual(1.25, get_union_area([(0, 0, 1, 1), (0.5, 0.5, 1.5, 1), (0, 0, 0.5, 0.5)]))
+        self.assertEqual(0, get_union_area(np.empty((0, 4))))
+
+    def test_calculate_bounding_boxes(self):
+        mask = np.zeros((50, 50), dtype=np.uint8)
+        mask[5:10, 20:30] = 1
+        mask[30:41, 2:4] = 1
+        mask[40, 4] = 1
+
+        self.assertEqual(calculate_bounding_boxes(mask), [(20, 29, 5, 9), (2, 4, 30, 40)])
@@ -0,0 +1,38 @@
+import os
+import time
+from unittest import TestCase
+
+from datariot.__spi__.type import ParseFailure
+from datariot.__util__.parallel_util import parse_files, parse_files_parallel
+
+
+def _parse(path: str) -> str:
+    if path == "fail":
+        raise ValueError(path)
+    if path == "hang":
+        time.sleep(60)
+    if path == "crash":
+        os._exit(1)
+    return path.upper()
+
+
+class ParallelUtilTest(TestCase):
+
+    def test_parse_files_parallel(self):
+        files = ["a", "fail", "b", "hang", "crash", "c"]
+        results = list(parse_files_parallel(_parse, files, workers=2, timeout=2))
+
+        parsed = sorted(e for e in results if not isinstance(e, ParseFailure))
+        failed = sorted(e.path for e in results if isinstance(e, ParseFailure))
+
+        self.assertEqual(parsed, ["A", "B", "C"])
+        self.assertEqual(failed, ["crash", "fail", "hang"])
+
+    def test_parse_files_skips_failures(self):
+        files = ["a", "fail", "b"]
+
+        for workers in (1, 2):
+            with self.assertLogs(level="WARNING") as logs:
+                self.assertEqual(["A", "B"], sorted(parse_files(_parse, files, workers=workers)))
+            self.assertEqual(1, len(logs.output))
+            self.assertIn("error while parsing fail", logs.output[0])
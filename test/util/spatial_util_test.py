@@ -0,0 +1,24 @@
+import random
+from unittest import TestCase
+
+from datariot.__spi__.type import Box
+from datariot.__util__.spatial_util import BoxIndex
+
+
+class BoxIndexTest(TestCase):
+
+    def test_query(self):
+        random.seed(0)
+        boxes = []
+        for _ in range(200):
+            x, y = random.randint(0, 500), random.randint(0, 800)
+            boxes.append(Box(x, x + random.randint(0, 80), y, y + random.randint(0, 80)))
+
+        index = BoxIndex(boxes)
+        for _ in range(100):
+            x, y = random.randint(-50, 550), random.randint(-50, 850)
+            query = Box(x, x + random.randint(0, 100), y, y + random.randint(0, 100))
+
+            expected = [i for i, b in enumerate(boxes) if b.intersect(query)]
+            found = [i for i in index.query_box(query) if boxes[i].intersect(query)]
+            self.assertEqual(expected, found)